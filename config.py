@@ -1,108 +1,116 @@
 """
-Configuration management using pydantic-settings.
+Configuration management using environment variables.
 Handles all environment variables with validation and defaults.
 """
+import os
+import json
+from dataclasses import dataclass, field
 from functools import lru_cache
-from typing import List
-from pydantic_settings import BaseSettings
-from pydantic import Field
+from typing import Dict, FrozenSet, Optional
 
+from dotenv import dotenv_values
 
-class Settings(BaseSettings):
+
+def _read_int(env: Dict[str, str], name: str, default: int, ge: int, le: int) -> int:
+    """Read an integer setting and check it lies within [ge, le]."""
+    value = int(env.get(name, default))
+    if not ge <= value <= le:
+        raise ValueError(f"{name} must be between {ge} and {le}, got {value}")
+    return value
+
+
+def _read_float(env: Dict[str, str], name: str, default: float, ge: float, le: float) -> float:
+    """Read a float setting and check it lies within [ge, le]."""
+    value = float(env.get(name, default))
+    if not ge <= value <= le:
+        raise ValueError(f"{name} must be between {ge} and {le}, got {value}")
+    return value
+
+
+@dataclass(frozen=True, slots=True)
+class Settings:
     """
     Application settings loaded from environment variables.
     
-    Uses pydantic-settings for automatic validation and type coercion.
+    Values are read once by from_env(); variables set in the process
+    environment take precedence over those in a local .env file.
     """
     
     # Required settings
-    gemini_api_key: str = Field(
-        ...,
-        description="Google Gemini API key (required)",
-        json_schema_extra={"env": "GEMINI_API_KEY"}
-    )
+    gemini_api_key: str = field(repr=False)  # Google Gemini API key (GEMINI_API_KEY)
     
     # Server settings
-    port: int = Field(
-        default=8000,
-        description="Server port (default: 8000 for App Runner)",
-        ge=1,
-        le=65535
-    )
-    
-    environment: str = Field(
-        default="production",
-        description="Environment name (development, staging, production)"
-    )
+    port: int = 8000  # Server port (default: 8000 for App Runner)
+    environment: str = "production"  # development, staging, production
     
     # File handling settings
-    max_file_size_mb: int = Field(
-        default=100,
-        description="Maximum file size in megabytes",
-        ge=1,
-        le=500
-    )
-    
-    request_timeout: int = Field(
-        default=300,
-        description="Request timeout in seconds",
-        ge=30,
-        le=600
-    )
-    
-    allowed_audio_extensions: List[str] = Field(
-        default=[".mp3", ".wav", ".m4a", ".ogg", ".webm"],
-        description="Allowed audio file extensions"
-    )
+    max_file_size_mb: int = 100  # Maximum file size in megabytes
+    request_timeout: int = 300  # Request timeout in seconds
+    allowed_audio_extensions: FrozenSet[str] = frozenset({".mp3", ".wav", ".m4a", ".ogg", ".webm"})
     
     # Gemini model settings
-    gemini_model: str = Field(
-        default="gemini-2.0-flash-exp",
-        description="Gemini model to use for AI operations"
-    )
-    
-    transcription_temperature: float = Field(
-        default=0.1,
-        description="Temperature for transcription (low for accuracy)",
-        ge=0.0,
-        le=1.0
-    )
-    
-    summarization_temperature: float = Field(
-        default=0.3,
-        description="Temperature for summarization (slightly creative)",
-        ge=0.0,
-        le=1.0
-    )
-    
-    max_output_tokens: int = Field(
-        default=16384,
-        description="Maximum output tokens for Gemini responses",
-        ge=1000,
-        le=65536
-    )
-    
-    class Config:
-        """Pydantic settings configuration."""
-        env_file = ".env"
-        env_file_encoding = "utf-8"
-        case_sensitive = False
-        extra = "ignore"
-    
-    @property
-    def max_file_size_bytes(self) -> int:
-        """Convert max file size from MB to bytes."""
-        return self.max_file_size_mb * 1024 * 1024
-    
-    @property
-    def is_development(self) -> bool:
-        """Check if running in development mode."""
-        return self.environment.lower() == "development"
-    
-    @property
-    def is_production(self) -> bool:
-        """Check if running in production mode."""
-        return self.environment.lower() == "production"
+    gemini_model: str = "gemini-2.0-flash-exp"
+    transcription_temperature: float = 0.1  # Low for accuracy
+    summarization_temperature: float = 0.3  # Slightly creative
+    max_output_tokens: int = 16384
+    
+    # Derived once in __post_init__
+    max_file_size_bytes: int = field(init=False)
+    is_development: bool = field(init=False)
+    is_production: bool = field(init=False)
+    
+    def __post_init__(self):
+        """Compute derived settings once; the dataclass is frozen."""
+        environment = self.environment.casefold()
+        object.__setattr__(self, "max_file_size_bytes", self.max_file_size_mb * 1024 * 1024)
+        object.__setattr__(self, "is_development", environment == "development")
+        object.__setattr__(self, "is_production", environment == "production")
+    
+    @classmethod
+    def from_env(cls, env_file: Optional[str] = ".env") -> "Settings":
+        """
+        Build settings from the environment.
+        
+        Variable names are matched case-insensitively.
+        
+        Args:
+            env_file: Optional dotenv file read beneath the process environment
+        
+        Returns:
+            Settings: Validated settings instance
+        
+        Raises:
+            ValueError: If a required variable is missing or a value is out of range
+        """
+        env = {}
+        if env_file and os.path.exists(env_file):
+            env.update(
+                (key.upper(), value)
+                for key, value in dotenv_values(env_file, encoding="utf-8").items()
+                if value is not None
+            )
+        env.update((key.upper(), value) for key, value in os.environ.items())
+        
+        gemini_api_key = env.get("GEMINI_API_KEY")
+        if not gemini_api_key:
+            raise ValueError("GEMINI_API_KEY environment variable required")
+        
+        extra = {}
+        if "ALLOWED_AUDIO_EXTENSIONS" in env:
+            extra["allowed_audio_extensions"] = frozenset(json.loads(env["ALLOWED_AUDIO_EXTENSIONS"]))
+        
+        return cls(
+            gemini_api_key=gemini_api_key,
+            port=_read_int(env, "PORT", 8000, ge=1, le=65535),
+            environment=env.get("ENVIRONMENT", "production"),
+            max_file_size_mb=_read_int(env, "MAX_FILE_SIZE_MB", 100, ge=1, le=500),
+            request_timeout=_read_int(env, "REQUEST_TIMEOUT", 300, ge=30, le=600),
+            gemini_model=env.get("GEMINI_MODEL", "gemini-2.0-flash-exp"),
+            transcription_temperature=_read_float(env, "TRANSCRIPTION_TEMPERATURE", 0.1, ge=0.0, le=1.0),
+            summarization_temperature=_read_float(env, "SUMMARIZATION_TEMPERATURE", 0.3, ge=0.0, le=1.0),
+            max_output_tokens=_read_int(env, "MAX_OUTPUT_TOKENS", 16384, ge=1000, le=65536),
+            **extra
+        )
 
 
 @lru_cache()
@@ -115,7 +123,7 @@ def get_settings() -> Settings:
     Returns:
         Settings: Application settings instance
     """
-    return Settings()
+    return Settings.from_env()
 
 
 # Expose settings instance for direct import
@@ -5,12 +5,12 @@ Main application entry point for AWS App Runner deployment.
 import os
 import sys
 import logging
-from datetime import datetime
+from datetime import datetime, timezone
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, HTTPException, Request
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+import orjson
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import JSONResponse, ORJSONResponse
 
 # Configure logging
 logging.basicConfig(
@@ -28,7 +28,9 @@ if not GEMINI_API_KEY:
 
 # Import routers after environment validation
 from routers import transcribe, refine, summarize
+from services.gemini_service import load_gemini_service
 from models import HealthResponse
+from middleware import AllowAllCORSMiddleware
 
 
 @asynccontextmanager
@@ -42,6 +44,9 @@ async def lifespan(app: FastAPI):
     logger.info("Gemini API Key: configured ✓")
     logger.info("=" * 50)
     
+    # Load the Gemini SDK before serving, not on the first request
+    load_gemini_service()
+    
     yield
     
     # Shutdown
@@ -70,17 +75,12 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
-# Configure CORS middleware (development mode - allows all origins)
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+# Configure CORS (allows all origins, methods and headers with credentials)
+app.add_middleware(AllowAllCORSMiddleware)
 
 # Include routers
 app.include_router(transcribe.router, tags=["Transcription"])
@@ -122,7 +122,9 @@ async def value_error_handler(request: Request, exc: ValueError):
 @app.exception_handler(Exception)
 async def general_exception_handler(request: Request, exc: Exception):
     """Handle unexpected exceptions."""
-    logger.error(f"Unexpected error: {str(exc)} - Path: {request.url.path}", exc_info=True)
+    logger.error(f"Unexpected error: {str(exc)} - Path: {request.url.path}")
+    # Tracebacks are only formatted when debug logging is enabled
+    logger.debug("Unexpected error traceback", exc_info=True)
     return JSONResponse(
         status_code=500,
         content={
@@ -135,7 +137,22 @@ async def general_exception_handler(request: Request, exc: Exception):
 
 
 # Health check endpoints
-@app.get("/", response_model=dict, summary="Simple Health Check")
+
+# Pre-encoded body for the load balancer probe; nothing to serialize per call
+_OK_RESPONSE = Response(content=b'{"status":"ok"}', media_type="application/json")
+
+# Detailed health payload only varies by timestamp; encode the rest once
+_HEALTH_PREFIX = (
+    b'{"status":"healthy","service":"Meeting Notes Intelligence Suite",'
+    b'"version":"1.0.0","timestamp":"'
+)
+_HEALTH_SUFFIX = (
+    b'","environment":' + orjson.dumps(os.environ.get("ENVIRONMENT", "production"))
+    + b',"gemini_configured":' + orjson.dumps(bool(GEMINI_API_KEY)) + b'}'
+)
+
+
+@app.get("/", include_in_schema=False, summary="Simple Health Check")
 async def health():
     """
     Simple health check endpoint for AWS App Runner.
@@ -143,7 +160,7 @@ async def health():
     Returns a minimal response to confirm the service is running.
     This endpoint is called frequently by the load balancer.
     """
-    return {"status": "ok"}
+    return _OK_RESPONSE
 
 
 @app.get("/health", response_model=HealthResponse, summary="Detailed Health Check")
@@ -154,13 +171,10 @@ async def health_detailed():
     Returns comprehensive information about the service status,
     version, and current timestamp.
     """
-    return HealthResponse(
-        status="healthy",
-        service="Meeting Notes Intelligence Suite",
-        version="1.0.0",
-        timestamp=datetime.utcnow().isoformat() + "Z",
-        environment=os.environ.get("ENVIRONMENT", "production"),
-        gemini_configured=bool(GEMINI_API_KEY)
+    timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ").encode()
+    return Response(
+        content=_HEALTH_PREFIX + timestamp + _HEALTH_SUFFIX,
+        media_type="application/json"
     )
 
 
@@ -0,0 +1,121 @@
+"""
+ASGI middleware for the Meeting Notes Intelligence Suite.
+"""
+from typing import List, Optional, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+ALL_METHODS = ("DELETE", "GET", "HEAD", "OPTIONS", "PATCH", "POST", "PUT")
+
+_ALLOW_ORIGIN = b"access-control-allow-origin"
+_ALLOW_CREDENTIALS = (b"access-control-allow-credentials", b"true")
+
+# Headers added to every non-preflight response carrying an Origin
+_SIMPLE_HEADERS = [(_ALLOW_ORIGIN, b"*"), _ALLOW_CREDENTIALS]
+
+# Headers common to every preflight response
+_PREFLIGHT_HEADERS = [
+    (b"vary", b"Origin"),
+    (b"access-control-allow-methods", ", ".join(ALL_METHODS).encode("latin-1")),
+    (b"access-control-max-age", b"600"),
+    _ALLOW_CREDENTIALS,
+]
+
+
+class AllowAllCORSMiddleware:
+    """
+    CORS middleware allowing any origin, method and header with credentials.
+    
+    Produces the same headers as Starlette's CORSMiddleware configured with
+    allow_origins=["*"], allow_methods=["*"], allow_headers=["*"] and
+    allow_credentials=True, but writes precomputed header bytes instead of
+    evaluating the policy on every request.
+    """
+    
+    def __init__(self, app: ASGIApp):
+        """
+        Wrap an ASGI application.
+        
+        Args:
+            app: The application to add CORS headers to
+        """
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        origin = requested_method = requested_headers = None
+        has_cookie = False
+        for name, value in scope["headers"]:
+            if name == b"origin":
+                origin = value
+            elif name == b"access-control-request-method":
+                requested_method = value
+            elif name == b"access-control-request-headers":
+                requested_headers = value
+            elif name == b"cookie":
+                has_cookie = True
+        
+        # Not a cross-origin request (e.g. load balancer probes)
+        if origin is None:
+            await self.app(scope, receive, send)
+            return
+        
+        if scope["method"] == "OPTIONS" and requested_method is not None:
+            await self._preflight_response(send, origin, requested_method, requested_headers)
+            return
+        
+        async def send_with_cors(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", ()))
+                if has_cookie:
+                    # Credentialed requests must see their own origin, not '*'
+                    _set_header(headers, _ALLOW_ORIGIN, origin)
+                    _set_header(headers, *_ALLOW_CREDENTIALS)
+                    _add_vary_origin(headers)
+                else:
+                    for name, value in _SIMPLE_HEADERS:
+                        _set_header(headers, name, value)
+                message["headers"] = headers
+            await send(message)
+        
+        await self.app(scope, receive, send_with_cors)
+    
+    @staticmethod
+    async def _preflight_response(
+        send: Send,
+        origin: bytes,
+        requested_method: bytes,
+        requested_headers: Optional[bytes]
+    ) -> None:
+        """Answer a CORS preflight request without reaching the app."""
+        headers = _PREFLIGHT_HEADERS + [(_ALLOW_ORIGIN, origin)]
+        if requested_headers is not None:
+            headers.append((b"access-control-allow-headers", requested_headers))
+        
+        if requested_method.decode("latin-1") in ALL_METHODS:
+            status, body = 200, b"OK"
+        else:
+            status, body = 400, b"Disallowed CORS method"
+        
+        headers.append((b"content-length", str(len(body)).encode("latin-1")))
+        headers.append((b"content-type", b"text/plain; charset=utf-8"))
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+
+
+def _set_header(headers: List[Tuple[bytes, bytes]], name: bytes, value: bytes) -> None:
+    """Replace every existing value of a header with a single new value."""
+    headers[:] = [item for item in headers if item[0] != name]
+    headers.append((name, value))
+
+
+def _add_vary_origin(headers: List[Tuple[bytes, bytes]]) -> None:
+    """Append Origin to the Vary header, creating it if absent."""
+    for index, (name, value) in enumerate(headers):
+        if name == b"vary":
+            headers[index] = (name, value + b", Origin")
+            return
+    headers.append((b"vary", b"Origin"))
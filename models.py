@@ -2,8 +2,13 @@
 Pydantic models for request/response validation.
 Defines all data structures used in the API.
 """
+import re
 from typing import Optional, List, Dict
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+
+
+# Accepted meeting date formats: YYYY-MM-DD, MM/DD/YYYY, MM-DD-YYYY
+_DATE_RE = re.compile(r"^(?:\d{4}-\d{2}-\d{2}|\d{2}/\d{2}/\d{4}|\d{2}-\d{2}-\d{4})$")
 
 
 # =============================================================================
@@ -13,6 +18,9 @@ from pydantic import BaseModel, Field, field_validator
 class RefinementRequest(BaseModel):
     """Request model for transcript refinement."""
     
+    # Immutable and strict about unknown keys; strings are used as received
+    model_config = ConfigDict(frozen=True, extra="forbid", str_strip_whitespace=False)
+    
     transcript: str = Field(
         ...,
         min_length=10,
@@ -33,10 +41,8 @@ class RefinementRequest(BaseModel):
     @field_validator("speaker_mapping")
     @classmethod
     def validate_speaker_mapping(cls, v: Dict[str, str]) -> Dict[str, str]:
-        """Validate that speaker mapping is not empty and has valid entries."""
-        if not v:
-            raise ValueError("speaker_mapping cannot be empty")
-        
+        """Validate that every speaker mapping entry is non-blank."""
+        # An empty mapping is already rejected by min_length before this runs
         for key, value in v.items():
             if not key.strip() or not value.strip():
                 raise ValueError("Speaker mapping keys and values cannot be empty")
@@ -47,6 +53,9 @@ class RefinementRequest(BaseModel):
 class TranscriptRequest(BaseModel):
     """Request model for meeting summarization."""
     
+    # Immutable and strict about unknown keys; strings are used as received
+    model_config = ConfigDict(frozen=True, extra="forbid", str_strip_whitespace=False)
+    
     text: str = Field(
         ...,
         min_length=50,
@@ -67,15 +76,7 @@ class TranscriptRequest(BaseModel):
     @classmethod
     def validate_date_format(cls, v: str) -> str:
         """Validate date format is ISO-like."""
-        import re
-        # Accept various date formats
-        patterns = [
-            r"^\d{4}-\d{2}-\d{2}$",  # YYYY-MM-DD
-            r"^\d{2}/\d{2}/\d{4}$",  # MM/DD/YYYY
-            r"^\d{2}-\d{2}-\d{4}$",  # MM-DD-YYYY
-        ]
-        
-        if not any(re.match(pattern, v) for pattern in patterns):
+        if not _DATE_RE.match(v):
             raise ValueError("Date must be in a valid format (e.g., YYYY-MM-DD)")
         
         return v
@@ -88,6 +89,8 @@ class TranscriptRequest(BaseModel):
 class TranscriptionResponse(BaseModel):
     """Response model for audio transcription."""
     
+    model_config = ConfigDict(defer_build=True)
+    
     filename: str = Field(
         ...,
         description="Original filename of the uploaded audio"
@@ -115,9 +118,84 @@ class TranscriptionResponse(BaseModel):
     )
 
 
+class BatchTranscriptionResult(BaseModel):
+    """One file's transcription from a finished batch job."""
+    
+    model_config = ConfigDict(defer_build=True)
+    
+    filename: str = Field(
+        ...,
+        description="Original filename of the uploaded audio"
+    )
+    
+    detected_date: Optional[str] = Field(
+        default=None,
+        description="Date extracted from filename (if found)"
+    )
+    
+    transcript: str = Field(
+        ...,
+        description="The verbatim transcript of the audio"
+    )
+    
+    speakers_identified: List[str] = Field(
+        default=[],
+        description="List of unique speaker identifiers found in the transcript"
+    )
+
+
+class BatchJobResponse(BaseModel):
+    """Response model for a submitted batch transcription job."""
+    
+    model_config = ConfigDict(defer_build=True)
+    
+    job_id: str = Field(
+        ...,
+        description="ID to poll at GET /transcribe/batch/{job_id}"
+    )
+    
+    state: str = Field(
+        ...,
+        description="Gemini batch state (e.g., 'BATCH_STATE_PENDING')"
+    )
+    
+    filenames: List[str] = Field(
+        ...,
+        description="Uploaded filenames, in the order results will be returned"
+    )
+
+
+class BatchStatusResponse(BaseModel):
+    """Response model for the status of a batch transcription job."""
+    
+    model_config = ConfigDict(defer_build=True)
+    
+    job_id: str = Field(
+        ...,
+        description="ID of the batch job"
+    )
+    
+    state: str = Field(
+        ...,
+        description="Gemini batch state (e.g., 'BATCH_STATE_RUNNING')"
+    )
+    
+    done: bool = Field(
+        ...,
+        description="Whether the job has finished"
+    )
+    
+    results: Optional[List[BatchTranscriptionResult]] = Field(
+        default=None,
+        description="One transcription per uploaded file, in upload order, once done"
+    )
+
+
 class RefinementResponse(BaseModel):
     """Response model for transcript refinement."""
     
+    model_config = ConfigDict(defer_build=True)
+    
     refined_transcript: str = Field(
         ...,
         description="The refined transcript with speaker names replaced"
@@ -138,6 +216,8 @@ class RefinementResponse(BaseModel):
 class SummaryResponse(BaseModel):
     """Response model for meeting summarization."""
     
+    model_config = ConfigDict(defer_build=True)
+    
     markdown: str = Field(
         ...,
         description="The complete Markdown-formatted meeting summary"
@@ -158,6 +238,8 @@ class SummaryResponse(BaseModel):
 class HealthResponse(BaseModel):
     """Response model for detailed health check."""
     
+    model_config = ConfigDict(defer_build=True)
+    
     status: str = Field(
         ...,
         description="Service health status"
@@ -192,6 +274,8 @@ class HealthResponse(BaseModel):
 class ErrorResponse(BaseModel):
     """Standard error response model."""
     
+    model_config = ConfigDict(defer_build=True)
+    
     error: bool = Field(
         default=True,
         description="Indicates this is an error response"
@@ -211,3 +295,22 @@ class ErrorResponse(BaseModel):
         default=None,
         description="Request path that caused the error"
     )
+
+
+# =============================================================================
+# Gemini Output Models
+# =============================================================================
+
+class TranscriptionOutput(BaseModel):
+    """Verbatim meeting transcript and the speakers who appear in it."""
+    
+    transcript: str = Field(
+        ...,
+        description="The verbatim transcript, one utterance per line"
+    )
+    
+    # The SDK drops "required" from response schemas, so Gemini may omit this
+    speakers: List[str] = Field(
+        default_factory=list,
+        description="Every distinct speaker label used in the transcript, without brackets"
+    )
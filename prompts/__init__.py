@@ -1,14 +1,25 @@
 """
 AI prompt templates for the Meeting Notes Intelligence Suite.
+
+Templates are loaded lazily on first attribute access (PEP 562).
 """
-from prompts.templates import (
-    TRANSCRIPTION_PROMPT,
-    REFINEMENT_PROMPT,
-    SUMMARIZATION_PROMPT
-)
 
 __all__ = [
     "TRANSCRIPTION_PROMPT",
     "REFINEMENT_PROMPT",
-    "SUMMARIZATION_PROMPT"
+    "SUMMARIZATION_PROMPT",
+    "PromptTemplate",
+    "REFINEMENT_TEMPLATE",
+    "SUMMARIZATION_TEMPLATE"
 ]
+
+
+def __getattr__(name: str):
+    """Import prompts.templates on first access and cache the attribute."""
+    if name in __all__:
+        from prompts import templates
+        
+        value = getattr(templates, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
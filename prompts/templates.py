@@ -2,6 +2,44 @@
 AI prompt templates for transcription, refinement, and summarization.
 Well-engineered prompts for consistent, high-quality outputs.
 """
+from string import Formatter
+from typing import List, Optional, Tuple
+
+
+class PromptTemplate:
+    """
+    A prompt template split into literal text and field names once.
+    
+    Rendering joins the precomputed pieces, avoiding the placeholder
+    parsing str.format repeats on every call. Only plain ``{name}``
+    fields are supported.
+    """
+    
+    __slots__ = ("_parts",)
+    
+    def __init__(self, template: str):
+        self._parts: List[Tuple[str, Optional[str]]] = []
+        for literal, field, spec, conversion in Formatter().parse(template):
+            if spec or conversion:
+                raise ValueError(f"Unsupported format spec in prompt field '{field}'")
+            self._parts.append((literal, field))
+    
+    def render(self, **values: str) -> str:
+        """
+        Fill the template fields.
+        
+        Args:
+            **values: Value for every field in the template
+            
+        Returns:
+            The rendered prompt
+        """
+        pieces = []
+        for literal, field in self._parts:
+            pieces.append(literal)
+            if field is not None:
+                pieces.append(values[field])
+        return "".join(pieces)
 
 TRANSCRIPTION_PROMPT = """You are a professional transcriptionist. Create a VERBATIM transcript of this audio.
 
@@ -15,8 +53,11 @@ STRICT RULES:
 7. Note any non-verbal audio cues in brackets [laughter], [pause], [crosstalk]
 
 OUTPUT FORMAT:
+Respond with JSON containing:
+- "transcript": the full transcript, one line per utterance, formatted as
 [Speaker A] [00:00]: Text of what they said...
 [Speaker B] [00:15]: Their response...
+- "speakers": every distinct speaker label used, without brackets (e.g. "Speaker A")
 
 Begin transcription now:"""
 
@@ -87,3 +128,8 @@ OUTPUT FORMAT (use exactly this structure):
 ## Full Transcript
 
 [Include the complete transcript below]"""
+
+
+# Pre-split templates used to build prompts per request
+REFINEMENT_TEMPLATE = PromptTemplate(REFINEMENT_PROMPT)
+SUMMARIZATION_TEMPLATE = PromptTemplate(SUMMARIZATION_PROMPT)
@@ -1,24 +1,101 @@
 """
 Refinement router for transcript speaker name mapping.
 """
+import re
 import time
 import logging
-from typing import List
+from collections import Counter
+from functools import lru_cache
+from typing import FrozenSet, List, Optional
 
-from fastapi import APIRouter, HTTPException, status
+import ahocorasick
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import ORJSONResponse
 
 from models import RefinementRequest, RefinementResponse
-from services.gemini_service import GeminiService
+from services.gemini_service import GeminiService, get_gemini_service
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-# Initialize service
-gemini_service = GeminiService()
 
+# Transcripts at least this long are scanned with Aho-Corasick instead of regex
+_AHOCORASICK_MIN_LENGTH = 1024 * 1024
 
-def detect_changes(original: str, refined: str, mapping: dict) -> List[str]:
+
+def _placeholder_words(placeholders: FrozenSet[str]) -> List[str]:
+    """List bracketed and bare placeholder forms, longest first."""
+    words = {form for placeholder in placeholders for form in (f"[{placeholder}]", placeholder)}
+    return sorted(words, key=len, reverse=True)
+
+
+@lru_cache(maxsize=64)
+def _build_placeholder_pattern(placeholders: FrozenSet[str]) -> re.Pattern:
+    """
+    Compile one alternation matching every placeholder form.
+    
+    Longer forms come first, so ``[Speaker A]`` is matched as a whole
+    rather than as a bare ``Speaker A`` mention.
+    
+    Args:
+        placeholders: Speaker placeholders from the mapping
+        
+    Returns:
+        Compiled pattern over all placeholder forms
+    """
+    return re.compile("|".join(re.escape(word) for word in _placeholder_words(placeholders)))
+
+
+@lru_cache(maxsize=64)
+def _build_placeholder_automaton(placeholders: FrozenSet[str]) -> ahocorasick.Automaton:
+    """
+    Build an Aho-Corasick automaton matching every placeholder form.
+    
+    Used for very large transcripts; scanned with ``iter_long`` so it
+    counts matches the same way as the regex alternation.
+    
+    Args:
+        placeholders: Speaker placeholders from the mapping
+        
+    Returns:
+        Finalized automaton whose values are the matched words
+    """
+    automaton = ahocorasick.Automaton()
+    for word in _placeholder_words(placeholders):
+        automaton.add_word(word, word)
+    automaton.make_automaton()
+    return automaton
+
+
+def _scan_placeholders(text: str, mapping: dict) -> Counter:
+    """
+    Count bracketed and bare placeholder occurrences in one pass.
+    
+    Args:
+        text: Transcript to scan
+        mapping: Speaker mapping whose keys are the placeholders
+        
+    Returns:
+        Counter keyed by matched form (``[Speaker A]`` or ``Speaker A``)
+    """
+    if not mapping:
+        return Counter()
+    
+    placeholders = frozenset(mapping)
+    if len(text) >= _AHOCORASICK_MIN_LENGTH:
+        automaton = _build_placeholder_automaton(placeholders)
+        return Counter(word for _, word in automaton.iter_long(text))
+    
+    return Counter(_build_placeholder_pattern(placeholders).findall(text))
+
+
+def detect_changes(
+    original: str,
+    refined: str,
+    mapping: dict,
+    counts: Optional[Counter] = None
+) -> List[str]:
     """
     Detect and describe changes made during refinement.
     
@@ -26,22 +103,28 @@ def detect_changes(original: str, refined: str, mapping: dict) -> List[str]:
         original: Original transcript
         refined: Refined transcript
         mapping: Speaker mapping used
+        counts: Placeholder counts for the original, if already scanned
         
     Returns:
         List of change descriptions
     """
+    # Identical output means nothing was replaced; skip all scanning
+    if original == refined:
+        return ["No changes were necessary"]
+    
     changes = []
     
+    # Only placeholders whose real name shows up in the output can have been replaced
+    replaced = {placeholder: real_name for placeholder, real_name in mapping.items() if real_name in refined}
+    if replaced and counts is None:
+        counts = _scan_placeholders(original, mapping)
+    
     # Check for each speaker replacement
-    for placeholder, real_name in mapping.items():
-        if placeholder in original and real_name in refined:
-            # Count occurrences
-            original_count = original.count(f"[{placeholder}]")
-            if original_count == 0:
-                original_count = original.count(placeholder)
-            
-            if original_count > 0:
-                changes.append(f"Replaced '{placeholder}' with '{real_name}' ({original_count} occurrences)")
+    for placeholder, real_name in replaced.items():
+        # Prefer bracketed occurrences, fall back to bare mentions
+        original_count = counts[f"[{placeholder}]"] or counts[placeholder]
+        if original_count:
+            changes.append(f"Replaced '{placeholder}' with '{real_name}' ({original_count} occurrences)")
     
     # Check if the transcript was changed
     if original.strip() == refined.strip():
@@ -72,7 +155,10 @@ def detect_changes(original: str, refined: str, mapping: dict) -> List[str]:
         500: {"description": "Internal server error"}
     }
 )
-async def refine_transcript(request: RefinementRequest) -> RefinementResponse:
+async def refine_transcript(
+    request: RefinementRequest,
+    gemini_service: GeminiService = Depends(get_gemini_service)
+) -> ORJSONResponse:
     """
     Refine a transcript with speaker name mapping.
     
@@ -100,14 +186,11 @@ async def refine_transcript(request: RefinementRequest) -> RefinementResponse:
                 detail="Speaker mapping cannot be empty"
             )
         
-        # Check if any placeholder exists in the transcript
-        found_any = False
-        for placeholder in request.speaker_mapping.keys():
-            if placeholder in request.transcript:
-                found_any = True
-                break
+        # Check if any placeholder exists in the transcript; the counts
+        # are reused when reporting changes so the scan happens once
+        placeholder_counts = _scan_placeholders(request.transcript, request.speaker_mapping)
         
-        if not found_any:
+        if not placeholder_counts:
             logger.warning("No speaker placeholders found in transcript")
             # Still proceed - the AI might find variations
         
@@ -123,23 +206,26 @@ async def refine_transcript(request: RefinementRequest) -> RefinementResponse:
         changes = detect_changes(
             original=request.transcript,
             refined=refined_transcript,
-            mapping=request.speaker_mapping
+            mapping=request.speaker_mapping,
+            counts=placeholder_counts
         )
         
         processing_time = time.time() - start_time
         logger.info(f"Refinement completed in {processing_time:.2f} seconds")
         logger.info(f"Changes detected: {changes}")
         
-        return RefinementResponse(
-            refined_transcript=refined_transcript,
-            changes_made=changes,
-            processing_time_seconds=round(processing_time, 2)
-        )
+        # response_model only documents the shape; a dict skips building the model
+        return ORJSONResponse(content={
+            "refined_transcript": refined_transcript,
+            "changes_made": changes,
+            "processing_time_seconds": round(processing_time, 2)
+        })
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Refinement error: {str(e)}", exc_info=True)
+        logger.error(f"Refinement error: {str(e)}")
+        logger.debug("Refinement error traceback", exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Refinement failed: {str(e)}"
@@ -1,22 +1,22 @@
 """
 Summarization router for generating structured meeting summaries.
 """
-import re
 import time
 import logging
 from typing import List
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import ORJSONResponse
 
 from models import TranscriptRequest, SummaryResponse
-from services.gemini_service import GeminiService
+from services.gemini_service import GeminiService, get_gemini_service
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-# Initialize service
-gemini_service = GeminiService()
+# Line prefixes that open a Markdown H2 heading; "###" does not match
+_SECTION_PREFIXES = ("## ", "##\t")
 
 
 def extract_sections(markdown: str) -> List[str]:
@@ -29,11 +29,14 @@ def extract_sections(markdown: str) -> List[str]:
     Returns:
         List of section heading names
     """
-    # Match Markdown headings (## Heading)
-    pattern = r'^##\s+(.+)$'
-    matches = re.findall(pattern, markdown, re.MULTILINE)
-    
-    return matches
+    sections = []
+    for line in markdown.splitlines():
+        if line.startswith(_SECTION_PREFIXES):
+            # Headings with no text after the marker are skipped
+            heading = line[3:].strip(" \t")
+            if heading:
+                sections.append(heading)
+    return sections
 
 
 @router.post(
@@ -57,7 +60,10 @@ def extract_sections(markdown: str) -> List[str]:
         500: {"description": "Internal server error"}
     }
 )
-async def summarize_transcript(request: TranscriptRequest) -> SummaryResponse:
+async def summarize_transcript(
+    request: TranscriptRequest,
+    gemini_service: GeminiService = Depends(get_gemini_service)
+) -> ORJSONResponse:
     """
     Generate a structured Markdown meeting summary.
     
@@ -98,16 +104,18 @@ async def summarize_transcript(request: TranscriptRequest) -> SummaryResponse:
         processing_time = time.time() - start_time
         logger.info(f"Summarization completed in {processing_time:.2f} seconds")
         
-        return SummaryResponse(
-            markdown=markdown,
-            sections=sections,
-            processing_time_seconds=round(processing_time, 2)
-        )
+        # response_model only documents the shape; a dict skips building the model
+        return ORJSONResponse(content={
+            "markdown": markdown,
+            "sections": sections,
+            "processing_time_seconds": round(processing_time, 2)
+        })
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Summarization error: {str(e)}", exc_info=True)
+        logger.error(f"Summarization error: {str(e)}")
+        logger.debug("Summarization error traceback", exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Summarization failed: {str(e)}"
@@ -4,16 +4,19 @@ Transcription router for audio file uploads and processing.
 import os
 import re
 import time
+import asyncio
 import logging
+import mimetypes
 import tempfile
 from pathlib import Path
-from typing import List
+from typing import List, Tuple
 
-from fastapi import APIRouter, UploadFile, File, HTTPException, status
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, status
+from fastapi.responses import ORJSONResponse
 
-from models import TranscriptionResponse
+from models import BatchJobResponse, BatchStatusResponse, TranscriptionOutput, TranscriptionResponse
 from config import settings
-from services.gemini_service import GeminiService
+from services.gemini_service import BatchJobNotFoundError, GeminiService, get_gemini_service
 from services.audio_service import AudioService
 from services.date_extractor import DateExtractor
 
@@ -21,8 +24,18 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Speaker labels such as "[Speaker A]:" or "[John] [00:05]:". Labels cannot
+# contain "[", which keeps the scan linear on runs of unclosed brackets
+_SPEAKER_RE = re.compile(r'\[([^\[\]]+)\](?:\s*\[\d{1,2}:\d{2}\])?:')
+
+# Gemini caps inline requests at 20 MB in total; audio up to this size is
+# sent with the prompt instead of going through a temp file and the Files API
+_INLINE_AUDIO_MAX_BYTES = 18 * 1024 * 1024
+
+# Batch job IDs as issued by Gemini, e.g. the "abc123" of "batches/abc123"
+_JOB_ID_RE = re.compile(r'[A-Za-z0-9_-]+')
+
 # Initialize services
-gemini_service = GeminiService()
 audio_service = AudioService()
 date_extractor = DateExtractor()
 
@@ -37,18 +50,156 @@ def extract_speakers(transcript: str) -> List[str]:
     Returns:
         List of unique speaker identifiers found
     """
-    # Match patterns like [Speaker A], [Speaker B], [John], etc.
-    pattern = r'\[([^\]]+)\](?:\s*\[\d{1,2}:\d{2}\])?:'
-    matches = re.findall(pattern, transcript)
+    # Match patterns like [Speaker A], [Speaker B], [John], etc.,
+    # skipping bare timestamps such as [00:00]:
+    speakers = {
+        match for match in _SPEAKER_RE.findall(transcript)
+        if not _is_timestamp(match)
+    }
+    
+    return sorted(speakers)
+
+
+def _speakers(output: TranscriptionOutput) -> List[str]:
+    """
+    Get the sorted speakers of a transcription.
+    
+    Uses the labels Gemini listed in its structured response, and only
+    scans the transcript when none were returned.
+    
+    Args:
+        output: Parsed transcription from Gemini
+        
+    Returns:
+        List of unique speaker identifiers
+    """
+    if output.speakers:
+        return sorted(set(output.speakers))
+    return extract_speakers(output.transcript)
+
+
+def _is_timestamp(label: str) -> bool:
+    """Check whether a bracketed label is an M:SS or MM:SS timestamp."""
+    minutes, sep, seconds = label.partition(':')
+    return (
+        bool(sep)
+        and 1 <= len(minutes) <= 2
+        and len(seconds) == 2
+        and minutes.isdecimal()
+        and seconds.isdecimal()
+    )
+
+
+def _check_extension(filename: str) -> str:
+    """
+    Return the lowercased extension of an upload, rejecting unsupported formats.
+    
+    Args:
+        filename: Name of the uploaded file
+        
+    Returns:
+        File extension (e.g., '.mp3')
+        
+    Raises:
+        HTTPException: If the extension is not allowed
+    """
+    file_ext = Path(filename).suffix.lower()
+    if file_ext not in settings.allowed_audio_extensions:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid file format. Allowed formats: {', '.join(sorted(settings.allowed_audio_extensions))}"
+        )
+    return file_ext
+
+
+def _mime_type(filename: str, file_ext: str) -> str:
+    """
+    Look up the MIME type to send to Gemini with an upload.
+    
+    Extensions allowed through ALLOWED_AUDIO_EXTENSIONS that AudioService
+    has no entry for fall back to the standard mimetypes table.
+    
+    Args:
+        filename: Name of the uploaded file
+        file_ext: Validated file extension
+        
+    Returns:
+        MIME type of the audio (e.g., 'audio/mp3')
+        
+    Raises:
+        HTTPException: If no audio MIME type is known for the extension
+    """
+    mime_type = AudioService.MIME_TYPES.get(file_ext) or mimetypes.guess_type(filename)[0]
+    if not mime_type or not mime_type.startswith("audio/"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported audio format: {file_ext}"
+        )
+    return mime_type
+
+
+def _file_too_large() -> HTTPException:
+    """Build the error returned for uploads over the size limit."""
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=f"File too large. Maximum size: {settings.max_file_size_mb} MB"
+    )
+
+
+def _empty_file() -> HTTPException:
+    """Build the error returned for empty uploads."""
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Empty file uploaded"
+    )
+
+
+def _check_declared_size(file: UploadFile) -> None:
+    """Reject on the size the multipart parser already recorded, before copying."""
+    if file.size is not None and file.size > settings.max_file_size_bytes:
+        raise _file_too_large()
+
+
+async def _save_upload(file: UploadFile, file_ext: str) -> Tuple[str, int]:
+    """
+    Stream an upload to a temporary file, enforcing the size limit as it goes.
+    
+    Args:
+        file: Uploaded audio file
+        file_ext: Validated file extension
+        
+    Returns:
+        Path to the temporary file and its size in bytes
+        
+    Raises:
+        HTTPException: If the file is too large or empty
+    """
+    _check_declared_size(file)
+    
+    try:
+        temp_path, file_size = await audio_service.save_temp_file(
+            file, file_ext, settings.max_file_size_bytes
+        )
+    except ValueError:
+        raise _file_too_large()
+    logger.info(f"Saved to temporary file: {temp_path}")
     
-    # Extract unique speakers (excluding timestamps)
-    speakers = set()
-    for match in matches:
-        # Skip if it looks like a timestamp
-        if not re.match(r'^\d{1,2}:\d{2}$', match):
-            speakers.add(match)
+    if file_size == 0:
+        await audio_service.delete_temp_file(temp_path)
+        raise _empty_file()
     
-    return sorted(list(speakers))
+    logger.info(f"File size: {file_size / 1024 / 1024:.2f} MB")
+    return temp_path, file_size
+
+
+def _remove_temp_file(temp_path: str) -> None:
+    """Remove a temporary file if it still exists, logging any failure."""
+    if os.path.exists(temp_path):
+        try:
+            os.remove(temp_path)
+            logger.info(f"Cleaned up temporary file: {temp_path}")
+        except Exception as e:
+            logger.warning(f"Failed to clean up temp file: {e}")
 
 
 @router.post(
@@ -70,18 +221,21 @@ def extract_speakers(transcript: str) -> List[str]:
     }
 )
 async def transcribe_audio(
-    file: UploadFile = File(..., description="Audio file to transcribe")
-) -> TranscriptionResponse:
+    file: UploadFile = File(..., description="Audio file to transcribe"),
+    gemini_service: GeminiService = Depends(get_gemini_service)
+) -> ORJSONResponse:
     """
     Transcribe an uploaded audio file using Google Gemini.
     
     The transcription process:
     1. Validates file extension and size
-    2. Saves file temporarily to /tmp/
-    3. Uploads to Google GenAI Files API
-    4. Calls Gemini with verbatim transcription prompt
-    5. Extracts speaker identifiers
-    6. Cleans up temporary files
+    2. Sends small files inline; larger ones are uploaded to the Google
+       GenAI Files API straight from the spooled upload
+    3. Calls Gemini with verbatim transcription prompt
+    4. Extracts speaker identifiers
+    
+    Uploads without a recorded size are copied to a temporary file, with
+    the size limit enforced as they are read, and it is removed afterwards.
     
     Returns a structured response with the transcript and metadata.
     """
@@ -93,60 +247,51 @@ async def transcribe_audio(
         filename = file.filename or "audio_file"
         logger.info(f"Received file for transcription: {filename}")
         
-        # Check file extension
-        file_ext = Path(filename).suffix.lower()
-        if file_ext not in settings.allowed_audio_extensions:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Invalid file format. Allowed formats: {', '.join(settings.allowed_audio_extensions)}"
-            )
-        
-        # Read file content
-        content = await file.read()
-        file_size = len(content)
-        
-        # Check file size
-        if file_size > settings.max_file_size_bytes:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"File too large. Maximum size: {settings.max_file_size_mb} MB"
-            )
-        
-        if file_size == 0:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Empty file uploaded"
-            )
-        
-        logger.info(f"File size: {file_size / 1024 / 1024:.2f} MB")
-        
-        # Save to temporary file
-        temp_path = await audio_service.save_temp_file(content, file_ext)
-        logger.info(f"Saved to temporary file: {temp_path}")
+        # Check file extension and declared size
+        file_ext = _check_extension(filename)
+        _check_declared_size(file)
         
         # Extract date from filename
         detected_date = date_extractor.extract_date(filename)
         if detected_date:
             logger.info(f"Detected date from filename: {detected_date}")
         
-        # Transcribe using Gemini
-        logger.info("Starting transcription with Gemini...")
-        transcript = await gemini_service.transcribe_audio(temp_path)
+        mime_type = _mime_type(filename, file_ext)
+        if file.size is None:
+            # Without a recorded size neither limit can be checked up front,
+            # so copy to a temp file, which stops at the maximum size
+            temp_path, _ = await _save_upload(file, file_ext)
+            logger.info("Starting transcription with Gemini...")
+            output = await gemini_service.transcribe_audio(temp_path)
+        elif file.size <= _INLINE_AUDIO_MAX_BYTES:
+            # Small files are sent inline, skipping the Files API upload
+            content = await file.read()
+            if not content:
+                raise _empty_file()
+            
+            logger.info("Starting inline transcription with Gemini...")
+            output = await gemini_service.transcribe_bytes(content, mime_type)
+        else:
+            # The multipart parser has already spooled the upload to disk, so
+            # it is uploaded from there instead of being copied to a temp file
+            logger.info("Starting transcription with Gemini...")
+            output = await gemini_service.transcribe_audio(file.file, mime_type)
         
-        # Extract speakers from transcript
-        speakers = extract_speakers(transcript)
+        # Speakers come from Gemini's structured response
+        speakers = _speakers(output)
         logger.info(f"Identified {len(speakers)} speakers: {speakers}")
         
         processing_time = time.time() - start_time
         logger.info(f"Transcription completed in {processing_time:.2f} seconds")
         
-        return TranscriptionResponse(
-            filename=filename,
-            detected_date=detected_date,
-            transcript=transcript,
-            speakers_identified=speakers,
-            processing_time_seconds=round(processing_time, 2)
-        )
+        # response_model only documents the shape; a dict skips building the model
+        return ORJSONResponse(content={
+            "filename": filename,
+            "detected_date": detected_date,
+            "transcript": output.transcript,
+            "speakers_identified": speakers,
+            "processing_time_seconds": round(processing_time, 2)
+        })
         
     except HTTPException:
         raise
@@ -157,16 +302,145 @@ async def transcribe_audio(
             detail="Transcription timed out. Please try with a shorter audio file."
         )
     except Exception as e:
-        logger.error(f"Transcription error: {str(e)}", exc_info=True)
+        logger.error(f"Transcription error: {str(e)}")
+        logger.debug("Transcription error traceback", exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Transcription failed: {str(e)}"
         )
     finally:
-        # Clean up temporary file
-        if temp_path and os.path.exists(temp_path):
-            try:
-                os.remove(temp_path)
-                logger.info(f"Cleaned up temporary file: {temp_path}")
-            except Exception as e:
-                logger.warning(f"Failed to clean up temp file: {e}")
+        if temp_path:
+            _remove_temp_file(temp_path)
+
+
+@router.post(
+    "/transcribe/batch",
+    response_model=BatchJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Submit Audio Files for Batch Transcription",
+    description="""
+    Upload several audio files for transcription through Gemini Batch Mode.
+    
+    Batch jobs cost half as much as interactive requests but can take up to
+    24 hours, so this endpoint only submits the job and returns its ID;
+    fetch results from GET /transcribe/batch/{job_id}.
+    Every file must pass the same format and size checks as /transcribe.
+    """,
+    responses={
+        202: {"description": "Batch job submitted"},
+        400: {"description": "Invalid file format or size"},
+        408: {"description": "Upload timeout"},
+        500: {"description": "Internal server error"}
+    }
+)
+async def transcribe_batch(
+    files: List[UploadFile] = File(..., description="Audio files to transcribe"),
+    gemini_service: GeminiService = Depends(get_gemini_service)
+) -> ORJSONResponse:
+    """
+    Submit several uploaded audio files as one Gemini batch job.
+    
+    All files are validated before any is saved, so a single bad file
+    rejects the whole batch. Saving and uploading are bounded by the
+    configured request timeout.
+    """
+    temp_paths = []
+    
+    try:
+        filenames = [file.filename or "audio_file" for file in files]
+        logger.info(f"Received {len(files)} files for batch transcription")
+        
+        extensions = [_check_extension(filename) for filename in filenames]
+        
+        async with asyncio.timeout(settings.request_timeout):
+            for file, file_ext in zip(files, extensions):
+                temp_path, _ = await _save_upload(file, file_ext)
+                temp_paths.append(temp_path)
+            
+            logger.info("Uploading batch audio to Gemini...")
+            audio_files = await gemini_service.upload_batch(temp_paths)
+        
+        # Submission is left out of the deadline: a job Gemini has already
+        # created would be reported as a timeout, and a retry billed twice
+        logger.info("Submitting batch transcription to Gemini...")
+        job = await gemini_service.submit_batch(audio_files, filenames)
+        
+        return ORJSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content={**job, "filenames": filenames}
+        )
+        
+    except HTTPException:
+        raise
+    except TimeoutError:
+        logger.error("Batch upload timed out")
+        raise HTTPException(
+            status_code=status.HTTP_408_REQUEST_TIMEOUT,
+            detail="Batch upload timed out. Please try with fewer or smaller audio files."
+        )
+    except Exception as e:
+        logger.error(f"Batch transcription error: {str(e)}")
+        logger.debug("Batch transcription error traceback", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Batch transcription failed: {str(e)}"
+        )
+    finally:
+        # Gemini has its own copy once uploaded, so local files can go now
+        for temp_path in temp_paths:
+            _remove_temp_file(temp_path)
+
+
+@router.get(
+    "/transcribe/batch/{job_id}",
+    response_model=BatchStatusResponse,
+    summary="Get Batch Transcription Status",
+    description="""
+    Check a batch transcription job submitted to POST /transcribe/batch.
+    
+    While the job runs only its state is returned; once it has succeeded the
+    transcriptions are included, one per file in upload order.
+    """,
+    responses={
+        200: {"description": "Job state, with results once done"},
+        404: {"description": "Unknown batch job"},
+        500: {"description": "Batch job failed or internal server error"}
+    }
+)
+async def get_batch_status(
+    job_id: str,
+    gemini_service: GeminiService = Depends(get_gemini_service)
+) -> ORJSONResponse:
+    """Report a batch job's state and, once it has succeeded, its transcriptions."""
+    try:
+        # IDs are generated by Gemini; anything else cannot name a job
+        if not _JOB_ID_RE.fullmatch(job_id):
+            raise BatchJobNotFoundError(f"Batch job not found: {job_id}")
+        
+        state, results = await gemini_service.get_batch(job_id)
+        
+        # response_model only documents the shape; a dict skips building the model
+        return ORJSONResponse(content={
+            "job_id": job_id,
+            "state": state,
+            "done": results is not None,
+            "results": None if results is None else [
+                {
+                    "filename": filename,
+                    "detected_date": date_extractor.extract_date(filename),
+                    "transcript": output.transcript,
+                    "speakers_identified": _speakers(output)
+                }
+                for filename, output in results
+            ]
+        })
+        
+    except BatchJobNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except Exception as e:
+        logger.error(f"Batch status error: {str(e)}")
+        logger.debug("Batch status error traceback", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Batch transcription failed: {str(e)}"
+        )
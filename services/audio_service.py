@@ -3,15 +3,75 @@ Audio file handling service.
 Manages temporary file storage and cleanup.
 """
 import os
-import uuid
+import time
+import asyncio
 import logging
 import tempfile
 from pathlib import Path
+from typing import BinaryIO, Collection, Tuple
 
-import aiofiles
+from fastapi import UploadFile
 
 logger = logging.getLogger(__name__)
 
+# Uploads are copied to disk in chunks of this many bytes
+_CHUNK_SIZE = 1024 * 1024
+
+
+def _copy_to_file(source: BinaryIO, file_path: str, max_size: int) -> int:
+    """
+    Copy a binary stream to a new file, removing it if max_size is exceeded.
+    
+    Blocking; run it in a worker thread.
+    
+    Args:
+        source: Stream to copy from
+        file_path: Destination path
+        max_size: Maximum number of bytes to accept
+        
+    Returns:
+        Number of bytes written
+        
+    Raises:
+        ValueError: If the stream holds more than max_size bytes
+    """
+    size = 0
+    try:
+        with open(file_path, 'wb') as f:
+            while chunk := source.read(_CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_size:
+                    raise ValueError(f"Upload exceeds {max_size} bytes")
+                f.write(chunk)
+    except ValueError:
+        _delete_file(file_path)
+        raise
+    return size
+
+
+def _delete_file(file_path: str) -> bool:
+    """
+    Delete a file if it exists. Blocking; run it in a worker thread.
+    
+    Args:
+        file_path: Path to the file to delete
+        
+    Returns:
+        True if deleted successfully, False otherwise
+    """
+    try:
+        if os.path.exists(file_path):
+            os.remove(file_path)
+            logger.info(f"Deleted temp file: {file_path}")
+            return True
+        else:
+            logger.warning(f"Temp file not found: {file_path}")
+            return False
+            
+    except OSError as e:
+        logger.error(f"Failed to delete temp file: {e}")
+        return False
+
 
 class AudioService:
     """
@@ -21,6 +81,15 @@ class AudioService:
     in the /tmp/ directory for processing.
     """
     
+    # MIME types Gemini accepts for inline audio, by file extension
+    MIME_TYPES = {
+        ".mp3": "audio/mp3",
+        ".wav": "audio/wav",
+        ".m4a": "audio/mp4",
+        ".ogg": "audio/ogg",
+        ".webm": "audio/webm"
+    }
+    
     def __init__(self, temp_dir: str = None):
         """
         Initialize the audio service.
@@ -30,36 +99,41 @@ class AudioService:
         """
         self.temp_dir = temp_dir or tempfile.gettempdir()
         
-        # Ensure temp directory exists
-        Path(self.temp_dir).mkdir(parents=True, exist_ok=True)
+        # Ensure a custom temp directory exists; the system one always does
+        if temp_dir:
+            Path(temp_dir).mkdir(parents=True, exist_ok=True)
         
         logger.info(f"Audio service initialized with temp dir: {self.temp_dir}")
     
-    async def save_temp_file(self, content: bytes, extension: str) -> str:
+    async def save_temp_file(self, file: UploadFile, extension: str, max_size: int) -> Tuple[str, int]:
         """
-        Save uploaded audio content to a temporary file.
+        Stream an uploaded audio file to a temporary file.
+        
+        The upload is copied in chunks so it is never held in memory whole,
+        with the whole copy done in a single worker thread.
         
         Args:
-            content: Raw audio file bytes
+            file: Uploaded audio file
             extension: File extension (e.g., '.mp3')
+            max_size: Maximum number of bytes to accept
             
         Returns:
-            Path to the temporary file
+            Path to the temporary file and the number of bytes written
             
         Raises:
+            ValueError: If the upload exceeds max_size
             IOError: If file cannot be saved
         """
         # Generate unique filename
-        unique_id = uuid.uuid4().hex[:12]
+        unique_id = os.urandom(6).hex()
         filename = f"audio_{unique_id}{extension}"
         file_path = os.path.join(self.temp_dir, filename)
         
         try:
-            async with aiofiles.open(file_path, 'wb') as f:
-                await f.write(content)
+            size = await asyncio.to_thread(_copy_to_file, file.file, file_path, max_size)
             
-            logger.info(f"Saved temp file: {file_path} ({len(content)} bytes)")
-            return file_path
+            logger.info(f"Saved temp file: {file_path} ({size} bytes)")
+            return file_path, size
             
         except IOError as e:
             logger.error(f"Failed to save temp file: {e}")
@@ -75,18 +149,7 @@ class AudioService:
         Returns:
             True if deleted successfully, False otherwise
         """
-        try:
-            if os.path.exists(file_path):
-                os.remove(file_path)
-                logger.info(f"Deleted temp file: {file_path}")
-                return True
-            else:
-                logger.warning(f"Temp file not found: {file_path}")
-                return False
-                
-        except OSError as e:
-            logger.error(f"Failed to delete temp file: {e}")
-            return False
+        return await asyncio.to_thread(_delete_file, file_path)
     
     def get_file_size(self, file_path: str) -> int:
         """
@@ -103,13 +166,13 @@ class AudioService:
         except OSError:
             return -1
     
-    def validate_extension(self, filename: str, allowed: list) -> bool:
+    def validate_extension(self, filename: str, allowed: Collection[str]) -> bool:
         """
         Check if a file has an allowed extension.
         
         Args:
             filename: Name of the file
-            allowed: List of allowed extensions (e.g., ['.mp3', '.wav'])
+            allowed: Allowed extensions, ideally a set (e.g., {'.mp3', '.wav'})
             
         Returns:
             True if extension is allowed, False otherwise
@@ -127,20 +190,27 @@ class AudioService:
         Returns:
             Number of files deleted
         """
-        import time
-        
+        return await asyncio.to_thread(self._cleanup_old_files, max_age_seconds)
+    
+    def _cleanup_old_files(self, max_age_seconds: int) -> int:
+        """Blocking scan and unlink for cleanup_old_files."""
         deleted_count = 0
         current_time = time.time()
         
         try:
-            for filename in os.listdir(self.temp_dir):
-                if filename.startswith("audio_"):
-                    file_path = os.path.join(self.temp_dir, filename)
-                    file_age = current_time - os.path.getmtime(file_path)
+            # scandir entries carry their type, so only one stat per candidate
+            with os.scandir(self.temp_dir) as entries:
+                for entry in entries:
+                    if not entry.name.startswith("audio_") or not entry.is_file():
+                        continue
                     
-                    if file_age > max_age_seconds:
-                        if await self.delete_temp_file(file_path):
+                    if current_time - entry.stat().st_mtime > max_age_seconds:
+                        try:
+                            os.unlink(entry.path)
+                            logger.info(f"Deleted temp file: {entry.path}")
                             deleted_count += 1
+                        except OSError as e:
+                            logger.error(f"Failed to delete temp file: {e}")
             
             if deleted_count > 0:
                 logger.info(f"Cleaned up {deleted_count} old temp files")
@@ -4,8 +4,9 @@ Supports multiple common date formats.
 """
 import re
 import logging
-from typing import Optional
+from typing import Optional, Tuple
 from datetime import datetime
+from functools import lru_cache
 
 logger = logging.getLogger(__name__)
 
@@ -37,73 +38,98 @@ class DateExtractor:
         'december': '12', 'dec': '12'
     }
     
-    # Regex patterns for different date formats
+    # Month names longest first, so 'september' is preferred over 'sep'
+    MONTH_ALTERNATION = "|".join(sorted(MONTHS, key=len, reverse=True))
+    
+    # Date formats in priority order: (group name, pattern, format type)
     PATTERNS = [
         # ISO format: 2023-10-27 or 2023_10_27
-        (r'(\d{4})[-_](\d{1,2})[-_](\d{1,2})', 'ymd'),
+        ('iso', r'(\d{4})[-_](\d{1,2})[-_](\d{1,2})', 'ymd'),
         
         # Dotted ISO: 2023.10.27
-        (r'(\d{4})\.(\d{1,2})\.(\d{1,2})', 'ymd'),
+        ('iso_dotted', r'(\d{4})\.(\d{1,2})\.(\d{1,2})', 'ymd'),
         
         # US format: 10-27-2023 or 10_27_2023
-        (r'(\d{1,2})[-_](\d{1,2})[-_](\d{4})', 'mdy'),
+        ('us', r'(\d{1,2})[-_](\d{1,2})[-_](\d{4})', 'mdy'),
         
         # Dotted US: 10.27.2023
-        (r'(\d{1,2})\.(\d{1,2})\.(\d{4})', 'mdy'),
+        ('us_dotted', r'(\d{1,2})\.(\d{1,2})\.(\d{4})', 'mdy'),
         
-        # Compact ISO: 20231027
-        (r'(\d{4})(\d{2})(\d{2})', 'ymd_compact'),
+        # Compact ISO: 20231027, only as a standalone run of exactly eight
+        # digits so longer numbers (IDs, timestamps) are not misread
+        ('compact', r'(?<!\d)(\d{4})(\d{2})(\d{2})(?!\d)', 'ymd_compact'),
         
-        # Written month: October 27 2023 or October-27-2023
-        (r'([a-zA-Z]+)\s*[-_]?\s*(\d{1,2})\s*[-_,]?\s*(\d{4})', 'written'),
+        # Written month: October 27 2023 or October-27-2023; the month must
+        # start a word, so 'mar' inside 'Grammar' is not read as March
+        ('written', rf'(?<![a-z])({MONTH_ALTERNATION})\s*[-_]?\s*(\d{{1,2}})\s*[-_,]?\s*(\d{{4}})', 'written'),
         
         # Written month reversed: 27 October 2023
-        (r'(\d{1,2})\s+([a-zA-Z]+)\s+(\d{4})', 'written_reversed'),
+        ('written_reversed', rf'(\d{{1,2}})\s+({MONTH_ALTERNATION})\s+(\d{{4}})', 'written_reversed'),
     ]
     
+    # All formats fused into one alternation; the outer named group that
+    # matched identifies the format, so the filename is scanned once
+    MASTER_RE = re.compile(
+        "|".join(f"(?P<{name}>{pattern})" for name, pattern, _ in PATTERNS),
+        re.IGNORECASE
+    )
+    
+    # Every format contains digits; used to skip filenames that cannot match
+    DIGIT_RE = re.compile(r'\d')
+    
+    # Format type handled by _parse_match for each named alternative
+    FORMAT_TYPES = dict((name, format_type) for name, _, format_type in PATTERNS)
+    
     def extract_date(self, filename: str) -> Optional[str]:
         """
         Extract date from a filename.
         
+        The first position where any format matches wins; if that match is
+        not a real date the scan resumes just after its start. Results are
+        cached per filename, since retried uploads repeat the same name.
+        
         Args:
             filename: The filename to parse
             
         Returns:
             ISO format date string (YYYY-MM-DD) or None if not found
         """
-        if not filename:
+        return _extract_date_cached(filename)
+    
+    def _extract_date(self, filename: str) -> Optional[str]:
+        """Uncached implementation of extract_date."""
+        if not filename or not self.DIGIT_RE.search(filename):
             return None
         
-        # Try each pattern
-        for pattern, format_type in self.PATTERNS:
-            match = re.search(pattern, filename, re.IGNORECASE)
+        match = self.MASTER_RE.search(filename)
+        while match:
+            name = match.lastgroup
+            # The three date components follow the outer named group
+            first = self.MASTER_RE.groupindex[name] + 1
+            format_type = self.FORMAT_TYPES[name]
             
-            if match:
-                try:
-                    date = self._parse_match(match, format_type)
-                    if date:
-                        logger.debug(f"Extracted date '{date}' from '{filename}' using pattern '{format_type}'")
-                        return date
-                except (ValueError, IndexError) as e:
-                    logger.debug(f"Pattern '{format_type}' matched but failed to parse: {e}")
-                    continue
+            date = self._parse_match(match.group(first, first + 1, first + 2), format_type)
+            if date:
+                logger.debug(f"Extracted date '{date}' from '{filename}' using pattern '{name}'")
+                return date
+            
+            logger.debug(f"Pattern '{name}' matched '{match.group()}' but is not a valid date")
+            match = self.MASTER_RE.search(filename, match.start() + 1)
         
         logger.debug(f"No date found in filename: {filename}")
         return None
     
-    def _parse_match(self, match: re.Match, format_type: str) -> Optional[str]:
+    def _parse_match(self, groups: Tuple[str, str, str], format_type: str) -> Optional[str]:
         """
-        Parse a regex match into an ISO date string.
+        Parse matched date components into an ISO date string.
         
         Args:
-            match: Regex match object
+            groups: The three captured date components, in pattern order
             format_type: Type of date format matched
             
         Returns:
             ISO format date string or None
         """
-        groups = match.groups()
-        
         if format_type == 'ymd':
             year, month, day = groups
             return self._format_date(int(year), int(month), int(day))
@@ -118,30 +144,18 @@ class DateExtractor:
         
         elif format_type == 'written':
             month_name, day, year = groups
-            month = self._month_to_number(month_name)
-            if month:
-                return self._format_date(int(year), int(month), int(day))
+            # The pattern only matches known month names
+            month = self.MONTHS[month_name.lower()]
+            return self._format_date(int(year), int(month), int(day))
         
         elif format_type == 'written_reversed':
             day, month_name, year = groups
-            month = self._month_to_number(month_name)
-            if month:
-                return self._format_date(int(year), int(month), int(day))
+            # The pattern only matches known month names
+            month = self.MONTHS[month_name.lower()]
+            return self._format_date(int(year), int(month), int(day))
         
         return None
     
-    def _month_to_number(self, month_name: str) -> Optional[str]:
-        """
-        Convert month name to two-digit number.
-        
-        Args:
-            month_name: Month name (e.g., 'October', 'Oct')
-            
-        Returns:
-            Two-digit month string or None
-        """
-        return self.MONTHS.get(month_name.lower().strip())
-    
     def _format_date(self, year: int, month: int, day: int) -> Optional[str]:
         """
         Format date components into ISO string with validation.
@@ -180,3 +194,13 @@ class DateExtractor:
             "27 October 2023 standup.mp3",
             "20231027_call.wav"
         ]
+
+
+# Extraction holds no per-instance state, so one shared instance backs the cache
+_default_extractor = DateExtractor()
+
+
+@lru_cache(maxsize=1024)
+def _extract_date_cached(filename: str) -> Optional[str]:
+    """Cached date extraction shared by all DateExtractor instances."""
+    return _default_extractor._extract_date(filename)
@@ -3,27 +3,175 @@ Google Gemini AI service for transcription, refinement, and summarization.
 Uses the google-generativeai library with retry logic and error handling.
 """
 import os
+import re
+import json
 import logging
 import asyncio
-from typing import Optional
-
-import google.generativeai as genai
-from tenacity import (
-    retry,
-    stop_after_attempt,
-    wait_exponential,
-    retry_if_exception_type
-)
+from functools import lru_cache
+from types import ModuleType
+from typing import TYPE_CHECKING, Any, BinaryIO, Callable, Dict, List, Optional, Tuple, TypeVar, Union
+
+import httpx
+from pydantic import ValidationError
 
 from config import settings
+from models import TranscriptionOutput
 from prompts.templates import (
     TRANSCRIPTION_PROMPT,
-    REFINEMENT_PROMPT,
-    SUMMARIZATION_PROMPT
+    REFINEMENT_TEMPLATE,
+    SUMMARIZATION_TEMPLATE
 )
 
+if TYPE_CHECKING:
+    import google.generativeai as genai
+
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+# Transient Gemini failures are retried with exponential backoff
+_MAX_ATTEMPTS = 3
+_RETRY_BASE_DELAY = 2
+_RETRY_MAX_DELAY = 30
+
+# REST endpoint for Batch Mode, which the google-generativeai SDK does not wrap
+_API_BASE_URL = "https://generativelanguage.googleapis.com/v1beta"
+
+# Upload processing is polled with backoff from the first to the max delay
+_UPLOAD_POLL_INITIAL = 0.25
+_UPLOAD_POLL_MAX = 2.0
+
+# The "transcript" string value of a JSON response, up to its closing quote
+# or the end of a truncated response; escapes are kept whole
+_TRANSCRIPT_VALUE_RE = re.compile(r'"transcript"\s*:\s*"((?:[^"\\]|\\.)*)')
+_PARTIAL_ESCAPE_RE = re.compile(r'\\u[0-9a-fA-F]{0,3}$')
+_HIGH_SURROGATE_RE = re.compile(r'\\u[dD][89abAB][0-9a-fA-F]{2}$')
+
+
+class BatchJobNotFoundError(Exception):
+    """Raised when Gemini has no batch job with the requested ID."""
+
+
+def _genai() -> ModuleType:
+    """Import the Gemini SDK on first use; it dominates app import time."""
+    import google.generativeai as genai
+    return genai
+
+
+def _parse_transcription(text: str) -> TranscriptionOutput:
+    """
+    Parse Gemini's structured transcription response.
+    
+    If the JSON is malformed (e.g. cut off at the output token limit) the
+    transcript value is recovered as far as it goes, with no speakers, so
+    callers fall back to extracting speakers from the transcript itself.
+    
+    Args:
+        text: Response text from a transcription request
+        
+    Returns:
+        Parsed transcription output
+        
+    Raises:
+        ValueError: If no transcript can be found in the response
+    """
+    try:
+        output = TranscriptionOutput.model_validate_json(text)
+    except ValidationError:
+        logger.warning("Transcription response was not valid JSON, recovering the transcript")
+        return TranscriptionOutput(transcript=_recover_transcript(text), speakers=[])
+    
+    return TranscriptionOutput(transcript=output.transcript.strip(), speakers=output.speakers)
+
+
+def _recover_transcript(text: str) -> str:
+    """
+    Decode the "transcript" string value from malformed or truncated JSON.
+    
+    Args:
+        text: Response text that failed to parse
+        
+    Returns:
+        The transcript up to where the value ends or the text was cut off
+        
+    Raises:
+        ValueError: If the response has no transcript value
+    """
+    match = _TRANSCRIPT_VALUE_RE.search(text)
+    if not match:
+        raise ValueError("Transcription response did not contain a transcript")
+    
+    # Drop an escape that was cut off, then the first half of a surrogate
+    # pair left without its second; a lone surrogate cannot be encoded
+    value = _PARTIAL_ESCAPE_RE.sub("", match.group(1))
+    value = _HIGH_SURROGATE_RE.sub("", value)
+    return json.loads(f'"{value}"', strict=False).strip()
+
+
+def _batch_transcripts(operation: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """
+    Read response texts out of a finished batch operation.
+    
+    Args:
+        operation: Completed batchGenerateContent operation, whose requests
+            are keyed req_0 .. req_{n-1} and carry their upload's filename
+        
+    Returns:
+        (filename, response text) pairs in request order
+        
+    Raises:
+        Exception: If the job or any individual request failed
+    """
+    state = operation.get("metadata", {}).get("state")
+    if "error" in operation or state != "BATCH_STATE_SUCCEEDED":
+        raise Exception(f"Batch job failed: {operation.get('error') or state}")
+    
+    inlined = operation["response"]["inlinedResponses"]["inlinedResponses"]
+    transcripts = [None] * len(inlined)
+    for item in inlined:
+        key = item["metadata"]["key"]
+        filename = item["metadata"].get("filename", key)
+        transcripts[int(key.removeprefix("req_"))] = (filename, _inlined_text(item, filename))
+    
+    if None in transcripts:
+        raise Exception("Batch job returned fewer responses than requests")
+    
+    return transcripts
+
+
+def _inlined_text(item: Dict[str, Any], filename: str) -> str:
+    """
+    Read the response text of one inlined batch request.
+    
+    Args:
+        item: Inlined response from a finished batch operation
+        filename: Upload name of the request, for error messages
+        
+    Returns:
+        The response text
+        
+    Raises:
+        Exception: If the request failed or was blocked before producing text
+    """
+    if "error" in item:
+        error = item["error"]
+        raise Exception(f"Batch request for {filename} failed: {error.get('message', error)}")
+    
+    # Blocked prompts come back with promptFeedback and no candidates, and
+    # blocked output with a finishReason and no content
+    response = item.get("response", {})
+    candidates = response.get("candidates") or [{}]
+    parts = candidates[0].get("content", {}).get("parts")
+    if not parts:
+        reason = (
+            response.get("promptFeedback", {}).get("blockReason")
+            or candidates[0].get("finishReason")
+            or "empty response"
+        )
+        raise Exception(f"Batch request for {filename} failed: {reason}")
+    
+    return "".join(part.get("text", "") for part in parts).strip()
+
 
 class GeminiService:
     """
@@ -35,6 +183,14 @@ class GeminiService:
     
     def __init__(self):
         """Initialize the Gemini service with API key."""
+        genai = _genai()
+        from google.api_core.exceptions import ResourceExhausted
+        from google.generativeai import protos
+        from google.generativeai.types import generation_types
+        
+        # Errors worth retrying: network trouble and per-minute quota limits
+        self.retryable_errors = (TimeoutError, ConnectionError, ResourceExhausted)
+        
         self.api_key = settings.gemini_api_key
         genai.configure(api_key=self.api_key)
         
@@ -42,11 +198,21 @@ class GeminiService:
         self.model_name = settings.gemini_model
         
         # Generation configs for different tasks
+        # Transcripts come back as JSON so speakers are listed by the model
         self.transcription_config = genai.GenerationConfig(
             temperature=settings.transcription_temperature,
-            max_output_tokens=settings.max_output_tokens
+            max_output_tokens=settings.max_output_tokens,
+            response_mime_type="application/json",
+            response_schema=TranscriptionOutput
         )
         
+        # The same config in REST form, for Batch Mode requests
+        self.transcription_config_json = json.loads(protos.GenerationConfig.to_json(
+            protos.GenerationConfig(generation_types.to_generation_config_dict(self.transcription_config)),
+            use_integers_for_enums=False,
+            always_print_fields_with_no_presence=False
+        ))
+        
         self.refinement_config = genai.GenerationConfig(
             temperature=settings.transcription_temperature,  # Low for accuracy
             max_output_tokens=settings.max_output_tokens
@@ -57,80 +223,317 @@ class GeminiService:
             max_output_tokens=settings.max_output_tokens
         )
         
+        # Models are immutable for a given config, so build each once
+        self.transcription_model = self._build_model(self.transcription_config)
+        self.refinement_model = self._build_model(self.refinement_config)
+        self.summarization_model = self._build_model(self.summarization_config)
+        
         logger.info(f"Gemini service initialized with model: {self.model_name}")
     
-    def _get_model(self, config: genai.GenerationConfig) -> genai.GenerativeModel:
-        """Get a configured Gemini model instance."""
-        return genai.GenerativeModel(
+    def _build_model(self, config: "genai.GenerationConfig") -> "genai.GenerativeModel":
+        """Build a configured Gemini model instance."""
+        return _genai().GenerativeModel(
             model_name=self.model_name,
             generation_config=config
         )
     
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=30),
-        retry=retry_if_exception_type((TimeoutError, ConnectionError))
-    )
-    async def transcribe_audio(self, file_path: str) -> str:
+    async def _call_with_retry(self, fn: Callable[..., T], *args: Any) -> T:
         """
-        Transcribe an audio file using Gemini.
+        Run a blocking Gemini SDK call in a worker thread, retrying transient errors.
         
         Args:
-            file_path: Path to the audio file
+            fn: SDK function to call
+            *args: Positional arguments for fn
             
         Returns:
-            Verbatim transcript with speaker identification
+            Whatever fn returns
             
         Raises:
-            Exception: If transcription fails after retries
+            Exception: The last error once all attempts are used, or any
+                non-retryable error immediately
+        """
+        for attempt in range(1, _MAX_ATTEMPTS + 1):
+            try:
+                return await asyncio.to_thread(fn, *args)
+            except self.retryable_errors as e:
+                if attempt == _MAX_ATTEMPTS:
+                    raise
+                delay = min(_RETRY_BASE_DELAY * 2 ** (attempt - 1), _RETRY_MAX_DELAY)
+                logger.warning(f"Gemini call failed ({type(e).__name__}: {e}), retrying in {delay}s")
+                await asyncio.sleep(delay)
+    
+    async def _upload_audio(
+        self,
+        audio: Union[str, BinaryIO],
+        mime_type: Optional[str] = None
+    ) -> "genai.types.File":
         """
-        logger.info(f"Uploading audio file: {file_path}")
+        Upload an audio file and wait until Gemini has processed it.
         
-        try:
-            # Upload file to Gemini
-            audio_file = genai.upload_file(file_path)
-            logger.info(f"File uploaded successfully: {audio_file.name}")
+        Args:
+            audio: Path to the audio file, or an open binary file
+            mime_type: MIME type of the audio; required for open files
             
-            # Wait for file to be processed
-            while audio_file.state.name == "PROCESSING":
-                logger.info("Waiting for file processing...")
-                await asyncio.sleep(2)
-                audio_file = genai.get_file(audio_file.name)
+        Returns:
+            The uploaded file, ready to be referenced in a prompt
+            
+        Raises:
+            Exception: If Gemini fails to process the file
+        """
+        if isinstance(audio, str):
+            logger.info(f"Uploading audio file: {audio}")
+            audio_file = await self._call_with_retry(_genai().upload_file, audio)
+        else:
+            logger.info(f"Uploading audio stream ({mime_type})")
+            audio_file = await self._call_with_retry(self._upload_stream, audio, mime_type)
+        logger.info(f"File uploaded successfully: {audio_file.name}")
+        
+        # Wait for file to be processed; short clips are usually ready
+        # within a fraction of a second, so start polling fast
+        delay = _UPLOAD_POLL_INITIAL
+        while audio_file.state.name == "PROCESSING":
+            logger.info("Waiting for file processing...")
+            await asyncio.sleep(delay)
+            audio_file = await asyncio.to_thread(_genai().get_file, audio_file.name)
+            delay = min(delay * 1.5, _UPLOAD_POLL_MAX)
+        
+        if audio_file.state.name == "FAILED":
+            raise Exception(f"File processing failed: {audio_file.state.name}")
+        
+        return audio_file
+    
+    def _upload_stream(self, audio: BinaryIO, mime_type: str) -> "genai.types.File":
+        """Upload an open file from its start; blocking, run through _call_with_retry."""
+        # A failed attempt may have consumed part of the stream
+        audio.seek(0)
+        return _genai().upload_file(audio, mime_type=mime_type)
+    
+    async def upload_batch(self, file_paths: List[str]) -> List["genai.types.File"]:
+        """
+        Upload several audio files concurrently and wait for all to be processed.
+        
+        If any upload fails, or the caller is cancelled, the rest are
+        cancelled and files that did finish uploading are deleted. Uploads
+        already running in a worker thread cannot be stopped; those files
+        expire from the Files API after 48 hours.
+        
+        Args:
+            file_paths: Paths to the audio files
             
-            if audio_file.state.name == "FAILED":
-                raise Exception(f"File processing failed: {audio_file.state.name}")
+        Returns:
+            The uploaded files, in the same order as file_paths
             
+        Raises:
+            Exception: The first upload failure
+        """
+        logger.info(f"Uploading {len(file_paths)} files for batch transcription")
+        
+        tasks = []
+        try:
+            async with asyncio.TaskGroup() as group:
+                tasks = [group.create_task(self._upload_audio(file_path)) for file_path in file_paths]
+        except BaseException as e:
+            # Cancellation (e.g. the request deadline) is a BaseException
+            for task in tasks:
+                if task.done() and not task.cancelled() and task.exception() is None:
+                    await self._delete_uploaded(task.result())
+            if isinstance(e, ExceptionGroup):
+                raise e.exceptions[0]
+            raise
+        
+        return [task.result() for task in tasks]
+    
+    async def _delete_uploaded(self, audio_file: "genai.types.File") -> None:
+        """Delete an uploaded file from Gemini, logging rather than raising on failure."""
+        try:
+            await asyncio.to_thread(_genai().delete_file, audio_file.name)
+            logger.info("Uploaded file cleaned up")
+        except Exception as e:
+            logger.warning(f"Failed to delete uploaded file: {e}")
+    
+    async def transcribe_audio(
+        self,
+        audio: Union[str, BinaryIO],
+        mime_type: Optional[str] = None
+    ) -> TranscriptionOutput:
+        """
+        Transcribe an audio file using Gemini.
+        
+        Args:
+            audio: Path to the audio file, or an open binary file such as
+                an upload's spooled file, which is uploaded without a copy
+            mime_type: MIME type of the audio; required for open files
+            
+        Returns:
+            Verbatim transcript and the speaker labels Gemini used
+            
+        Raises:
+            Exception: If transcription fails after retries
+        """
+        try:
+            audio_file = await self._upload_audio(audio, mime_type)
             logger.info("File ready for transcription")
             
             # Generate transcription
-            model = self._get_model(self.transcription_config)
-            
-            response = await asyncio.to_thread(
-                model.generate_content,
+            response = await self._call_with_retry(
+                self.transcription_model.generate_content,
                 [audio_file, TRANSCRIPTION_PROMPT]
             )
             
             # Clean up uploaded file
-            try:
-                genai.delete_file(audio_file.name)
-                logger.info("Uploaded file cleaned up")
-            except Exception as e:
-                logger.warning(f"Failed to delete uploaded file: {e}")
+            await self._delete_uploaded(audio_file)
             
-            transcript = response.text.strip()
-            logger.info(f"Transcription complete: {len(transcript)} characters")
+            output = _parse_transcription(response.text)
+            logger.info(f"Transcription complete: {len(output.transcript)} characters")
             
-            return transcript
+            return output
             
         except Exception as e:
             logger.error(f"Transcription error: {str(e)}")
             raise
     
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=30),
-        retry=retry_if_exception_type((TimeoutError, ConnectionError))
-    )
+    async def transcribe_bytes(self, content: bytes, mime_type: str) -> TranscriptionOutput:
+        """
+        Transcribe audio sent inline with the prompt.
+        
+        Skips the Files API upload, processing poll and delete, which
+        dominate latency for short recordings. Gemini limits inline requests
+        to 20 MB in total, so larger files must use transcribe_audio.
+        
+        Args:
+            content: Raw audio bytes
+            mime_type: MIME type of the audio (e.g., 'audio/mp3')
+            
+        Returns:
+            Verbatim transcript and the speaker labels Gemini used
+            
+        Raises:
+            Exception: If transcription fails after retries
+        """
+        try:
+            response = await self._call_with_retry(
+                self.transcription_model.generate_content,
+                [{"mime_type": mime_type, "data": content}, TRANSCRIPTION_PROMPT]
+            )
+            
+            output = _parse_transcription(response.text)
+            logger.info(f"Inline transcription complete: {len(output.transcript)} characters")
+            
+            return output
+            
+        except Exception as e:
+            logger.error(f"Transcription error: {str(e)}")
+            raise
+    
+    def _batch_client(self) -> httpx.AsyncClient:
+        """Build an HTTP client for the Batch Mode REST API."""
+        return httpx.AsyncClient(
+            base_url=_API_BASE_URL,
+            headers={"x-goog-api-key": self.api_key},
+            timeout=60
+        )
+    
+    async def submit_batch(
+        self,
+        audio_files: List["genai.types.File"],
+        filenames: List[str]
+    ) -> Dict[str, str]:
+        """
+        Start transcribing uploaded audio files with one Gemini Batch Mode job.
+        
+        Batch jobs are billed at half the interactive rate but can take up
+        to 24 hours, so this only submits the job; poll it with get_batch.
+        The uploaded audio is left in place for the job to read and expires
+        from the Files API after 48 hours.
+        
+        Args:
+            audio_files: Files returned by upload_batch
+            filenames: Original upload names, returned with each result
+            
+        Returns:
+            The job ID and its initial state
+            
+        Raises:
+            Exception: If the job submission fails
+        """
+        logger.info(f"Submitting batch transcription of {len(audio_files)} files")
+        
+        try:
+            requests = [
+                {
+                    "request": {
+                        "contents": [{
+                            "parts": [
+                                {"file_data": {"mime_type": audio_file.mime_type, "file_uri": audio_file.uri}},
+                                {"text": TRANSCRIPTION_PROMPT}
+                            ]
+                        }],
+                        "generation_config": self.transcription_config_json
+                    },
+                    "metadata": {"key": f"req_{index}", "filename": filename}
+                }
+                for index, (audio_file, filename) in enumerate(zip(audio_files, filenames))
+            ]
+            
+            async with self._batch_client() as client:
+                response = await client.post(
+                    f"/models/{self.model_name}:batchGenerateContent",
+                    json={
+                        "batch": {
+                            "display_name": f"transcribe-{len(requests)}-files",
+                            "input_config": {"requests": {"requests": requests}}
+                        }
+                    }
+                )
+                response.raise_for_status()
+                operation = response.json()
+            
+        except BaseException as e:
+            logger.error(f"Batch submission error: {str(e)}")
+            # Nothing will read the uploads without a job
+            for audio_file in audio_files:
+                await self._delete_uploaded(audio_file)
+            raise
+        
+        logger.info(f"Batch job submitted: {operation['name']}")
+        return {
+            "job_id": operation["name"].removeprefix("batches/"),
+            "state": operation.get("metadata", {}).get("state", "BATCH_STATE_PENDING")
+        }
+    
+    async def get_batch(self, job_id: str) -> Tuple[str, Optional[List[Tuple[str, TranscriptionOutput]]]]:
+        """
+        Check a batch transcription job, collecting its results once done.
+        
+        Args:
+            job_id: ID returned by submit_batch
+            
+        Returns:
+            The job state, and (filename, transcription) pairs in upload
+            order once the job has succeeded, or None while it is running
+            
+        Raises:
+            BatchJobNotFoundError: If there is no such job
+            Exception: If the job or any of its requests failed
+        """
+        async with self._batch_client() as client:
+            response = await client.get(f"/batches/{job_id}")
+        if response.status_code == 404:
+            raise BatchJobNotFoundError(f"Batch job not found: {job_id}")
+        response.raise_for_status()
+        operation = response.json()
+        
+        state = operation.get("metadata", {}).get("state", "BATCH_STATE_PENDING")
+        if not operation.get("done"):
+            return state, None
+        
+        results = [
+            (filename, _parse_transcription(text))
+            for filename, text in _batch_transcripts(operation)
+        ]
+        logger.info(f"Batch job {job_id} complete: {len(results)} transcripts")
+        return state, results
+    
     async def refine_transcript(
         self,
         transcript: str,
@@ -161,17 +564,15 @@ class GeminiService:
             )
             
             # Build prompt
-            prompt = REFINEMENT_PROMPT.format(
+            prompt = REFINEMENT_TEMPLATE.render(
                 speaker_mapping=mapping_str,
                 feedback=feedback or "None provided",
                 transcript=transcript
             )
             
             # Generate refined transcript
-            model = self._get_model(self.refinement_config)
-            
-            response = await asyncio.to_thread(
-                model.generate_content,
+            response = await self._call_with_retry(
+                self.refinement_model.generate_content,
                 prompt
             )
             
@@ -184,11 +585,6 @@ class GeminiService:
             logger.error(f"Refinement error: {str(e)}")
             raise
     
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=30),
-        retry=retry_if_exception_type((TimeoutError, ConnectionError))
-    )
     async def generate_summary(
         self,
         transcript: str,
@@ -213,17 +609,15 @@ class GeminiService:
         
         try:
             # Build prompt
-            prompt = SUMMARIZATION_PROMPT.format(
+            prompt = SUMMARIZATION_TEMPLATE.render(
                 date=date,
                 title=title,
                 transcript=transcript
             )
             
             # Generate summary
-            model = self._get_model(self.summarization_config)
-            
-            response = await asyncio.to_thread(
-                model.generate_content,
+            response = await self._call_with_retry(
+                self.summarization_model.generate_content,
                 prompt
             )
             
@@ -235,3 +629,30 @@ class GeminiService:
         except Exception as e:
             logger.error(f"Summarization error: {str(e)}")
             raise
+
+
+@lru_cache()
+def load_gemini_service() -> GeminiService:
+    """
+    Create the shared Gemini service instance.
+    
+    Called from the app lifespan, so the Gemini SDK is loaded at startup
+    rather than at import time or on the first request.
+    
+    Returns:
+        GeminiService: Shared service instance
+    """
+    return GeminiService()
+
+
+async def get_gemini_service() -> GeminiService:
+    """
+    Get the shared Gemini service instance.
+    
+    Used as a FastAPI dependency. It is async because FastAPI runs plain
+    function dependencies in the threadpool on every request.
+    
+    Returns:
+        GeminiService: Shared service instance
+    """
+    return load_gemini_service()
@@ -0,0 +1,69 @@
+"""
+Shared pytest fixtures.
+"""
+import os
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+import pytest_asyncio
+from httpx import ASGITransport, AsyncClient
+from pytest_asyncio import is_async_test
+
+# Settings are read when the app is imported, so set the key before any test module loads
+os.environ.setdefault("GEMINI_API_KEY", "test-api-key-for-testing")
+
+
+@pytest.fixture(scope="session")
+def app():
+    """The FastAPI application, imported on first use rather than at collection."""
+    from main import app as application
+    return application
+
+
+def pytest_collection_modifyitems(items):
+    """Run every async test on the session event loop the client lives on."""
+    session_loop = pytest.mark.asyncio(loop_scope="session")
+    for item in items:
+        if is_async_test(item):
+            item.add_marker(session_loop, append=False)
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def client(app):
+    """
+    Async client shared by the whole session, calling the app in-process.
+    
+    ASGITransport does not send lifespan events, so startup and shutdown
+    (which loads the Gemini SDK) are run here once around the session. The
+    OpenAPI schema is built lazily, so it is warmed here so its cost does
+    not land on whichever test happens to run first.
+    """
+    transport = ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with AsyncClient(transport=transport, base_url="http://test") as test_client:
+            await test_client.get("/openapi.json")
+            yield test_client
+
+
+@pytest.fixture
+def mock_gemini(app):
+    """
+    Mock Gemini service injected into every router for one test.
+    
+    Routers receive the service through Depends(get_gemini_service), so the
+    dependency is overridden instead of patching module attributes.
+    """
+    from services.gemini_service import get_gemini_service
+    
+    mock = MagicMock()
+    mock.refine_transcript = AsyncMock()
+    mock.generate_summary = AsyncMock()
+    mock.transcribe_audio = AsyncMock()
+    mock.transcribe_bytes = AsyncMock()
+    mock.upload_batch = AsyncMock()
+    mock.submit_batch = AsyncMock()
+    mock.get_batch = AsyncMock()
+    app.dependency_overrides[get_gemini_service] = lambda: mock
+    yield mock
+    app.dependency_overrides.pop(get_gemini_service, None)
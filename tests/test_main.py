@@ -2,31 +2,24 @@
 Tests for main app endpoints including health checks.
 """
 import pytest
-from fastapi.testclient import TestClient
 from unittest.mock import patch
-import os
 
-# Set test environment variable before importing app
-os.environ["GEMINI_API_KEY"] = "test-api-key-for-testing"
-
-from main import app
-
-client = TestClient(app)
+from models import HealthResponse
 
 
 class TestHealthEndpoints:
     """Test health check endpoints."""
     
-    def test_root_health_check(self):
+    async def test_root_health_check(self, client):
         """Test simple health check returns ok status."""
-        response = client.get("/")
+        response = await client.get("/")
         assert response.status_code == 200
         data = response.json()
         assert data["status"] == "ok"
     
-    def test_detailed_health_check(self):
+    async def test_detailed_health_check(self, client):
         """Test detailed health check returns full info."""
-        response = client.get("/health")
+        response = await client.get("/health")
         assert response.status_code == 200
         data = response.json()
         
@@ -34,15 +27,19 @@ class TestHealthEndpoints:
         assert data["service"] == "Meeting Notes Intelligence Suite"
         assert data["version"] == "1.0.0"
         assert "timestamp" in data
+        assert data["timestamp"].endswith("Z")
         assert data["gemini_configured"] is True
+        
+        # Pre-encoded payload must still match the documented schema
+        HealthResponse.model_validate(data)
 
 
 class TestCORS:
     """Test CORS middleware configuration."""
     
-    def test_cors_headers_present(self):
+    async def test_cors_headers_present(self, client):
         """Test that CORS headers are included in responses."""
-        response = client.options(
+        response = await client.options(
             "/",
             headers={
                 "Origin": "http://localhost:3000",
@@ -51,38 +48,74 @@ class TestCORS:
         )
         # CORS preflight should succeed
         assert response.status_code in [200, 204]
+        assert response.headers["access-control-allow-origin"] == "http://localhost:3000"
+        assert response.headers["access-control-allow-credentials"] == "true"
+        assert "POST" in response.headers["access-control-allow-methods"]
+    
+    async def test_cors_preflight_mirrors_requested_headers(self, client):
+        """Test that requested headers are echoed back on preflight."""
+        response = await client.options(
+            "/refine",
+            headers={
+                "Origin": "http://localhost:3000",
+                "Access-Control-Request-Method": "POST",
+                "Access-Control-Request-Headers": "content-type, x-request-id"
+            }
+        )
+        assert response.status_code == 200
+        assert response.headers["access-control-allow-headers"] == "content-type, x-request-id"
+    
+    async def test_cors_simple_request_allows_any_origin(self, client):
+        """Test that simple requests get the wildcard origin header."""
+        response = await client.get("/", headers={"Origin": "http://localhost:3000"})
+        assert response.status_code == 200
+        assert response.headers["access-control-allow-origin"] == "*"
+    
+    async def test_cors_credentialed_request_echoes_origin(self, client):
+        """Test that requests with cookies get their own origin back."""
+        response = await client.get(
+            "/",
+            headers={"Origin": "http://localhost:3000", "Cookie": "session=abc"}
+        )
+        assert response.headers["access-control-allow-origin"] == "http://localhost:3000"
+        assert "Origin" in response.headers["vary"]
+    
+    async def test_no_cors_headers_without_origin(self, client):
+        """Test that same-origin requests are left untouched."""
+        response = await client.get("/")
+        assert "access-control-allow-origin" not in response.headers
 
 
 class TestErrorHandling:
     """Test error handling endpoints."""
     
-    def test_404_not_found(self):
+    async def test_404_not_found(self, client):
         """Test 404 response for unknown endpoints."""
-        response = client.get("/nonexistent-endpoint")
+        response = await client.get("/nonexistent-endpoint")
         assert response.status_code == 404
     
-    def test_method_not_allowed(self):
+    async def test_method_not_allowed(self, client):
         """Test 405 response for wrong HTTP method."""
-        response = client.put("/")
+        response = await client.put("/")
         assert response.status_code == 405
 
 
 class TestAPIDocumentation:
     """Test API documentation endpoints."""
     
-    def test_swagger_docs_available(self):
+    async def test_swagger_docs_available(self, client):
         """Test Swagger UI is accessible."""
-        response = client.get("/docs")
+        response = await client.get("/docs")
         assert response.status_code == 200
     
-    def test_redoc_available(self):
+    async def test_redoc_available(self, client):
         """Test ReDoc is accessible."""
-        response = client.get("/redoc")
+        response = await client.get("/redoc")
         assert response.status_code == 200
     
-    def test_openapi_schema_available(self):
+    async def test_openapi_schema_available(self, client):
         """Test OpenAPI schema is accessible."""
-        response = client.get("/openapi.json")
+        response = await client.get("/openapi.json")
         assert response.status_code == 200
         data = response.json()
         assert data["info"]["title"] == "Meeting Notes Intelligence Suite"
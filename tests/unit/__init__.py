@@ -0,0 +1 @@
+"""Unit tests that exercise helpers and models without starting the app."""
@@ -0,0 +1,55 @@
+"""
+Tests for temporary audio file handling.
+"""
+import io
+import os
+
+import pytest
+from fastapi import UploadFile
+
+from services.audio_service import AudioService
+
+
+class TestSaveTempFile:
+    """Test streaming uploads to temporary files."""
+    
+    async def test_saves_content(self, tmp_path):
+        """Test the upload is written in full and its size reported."""
+        service = AudioService(temp_dir=str(tmp_path))
+        upload = UploadFile(file=io.BytesIO(b"fake audio content"), filename="a.mp3")
+        
+        path, size = await service.save_temp_file(upload, ".mp3", max_size=1024)
+        
+        assert size == 18
+        assert path.endswith(".mp3")
+        with open(path, "rb") as f:
+            assert f.read() == b"fake audio content"
+    
+    async def test_too_large_removes_partial_file(self, tmp_path):
+        """Test oversized uploads are rejected and leave nothing behind."""
+        service = AudioService(temp_dir=str(tmp_path))
+        upload = UploadFile(file=io.BytesIO(b"fake audio content"), filename="a.mp3")
+        
+        with pytest.raises(ValueError):
+            await service.save_temp_file(upload, ".mp3", max_size=4)
+        
+        assert os.listdir(tmp_path) == []
+
+
+class TestCleanupOldFiles:
+    """Test removal of stale temporary files."""
+    
+    async def test_removes_only_old_audio_files(self, tmp_path):
+        """Test old audio_ files are removed and everything else is kept."""
+        service = AudioService(temp_dir=str(tmp_path))
+        old_audio = tmp_path / "audio_old.mp3"
+        new_audio = tmp_path / "audio_new.mp3"
+        other = tmp_path / "notes.txt"
+        for path in (old_audio, new_audio, other):
+            path.write_bytes(b"x")
+        os.utime(old_audio, (0, 0))
+        os.utime(other, (0, 0))
+        
+        assert await service.cleanup_old_files(max_age_seconds=3600) == 1
+        
+        assert sorted(os.listdir(tmp_path)) == ["audio_new.mp3", "notes.txt"]
@@ -0,0 +1,50 @@
+"""
+Tests for filename date extraction.
+"""
+import pytest
+
+from services.date_extractor import DateExtractor
+
+extractor = DateExtractor()
+
+
+class TestExtractDate:
+    """Test date extraction from filenames."""
+    
+    @pytest.mark.parametrize("filename,expected", [
+        ("2023-10-27_Meeting.mp3", "2023-10-27"),
+        ("standup_2023_10_27.mp3", "2023-10-27"),
+        ("2023.10.27-standup.wav", "2023-10-27"),
+        ("Meeting_10-27-2023.mp3", "2023-10-27"),
+        ("call 10.27.2023.ogg", "2023-10-27"),
+        ("20231027_call.wav", "2023-10-27"),
+        ("October 27 2023 meeting.m4a", "2023-10-27"),
+        ("Dec 31, 2024 review.webm", "2024-12-31"),
+        ("sept-5-2024 sync.mp3", "2024-09-05"),
+        ("27 October 2023 standup.mp3", "2023-10-27")
+    ])
+    def test_supported_formats(self, filename, expected):
+        """Test each supported format is recognised."""
+        assert extractor.extract_date(filename) == expected
+    
+    @pytest.mark.parametrize("filename", [
+        "",
+        "recording.mp3",
+        "2023-13-45_bad.mp3",
+        "2023_2_29 notleap.mp3",
+        "call_120231027.wav",
+        "Grammar 5 2024.mp3",
+        "5 Decoder 2024.mp3",
+        "meetingOct 27 2023.mp3"
+    ])
+    def test_no_date(self, filename):
+        """Test filenames without a real date return None."""
+        assert extractor.extract_date(filename) is None
+    
+    def test_invalid_match_keeps_scanning(self):
+        """Test an invalid leading match does not hide a later date."""
+        assert extractor.extract_date("2023-13-45 retake of 10-27-2023.mp3") == "2023-10-27"
+    
+    def test_earliest_date_wins(self):
+        """Test the leftmost date in the filename is returned."""
+        assert extractor.extract_date("Meeting 2024-01-15 and 2024-01-16.mp3") == "2024-01-15"
@@ -0,0 +1,279 @@
+"""
+Tests for Gemini service helpers.
+"""
+import asyncio
+import io
+
+import httpx
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from services.gemini_service import (
+    BatchJobNotFoundError,
+    GeminiService,
+    _batch_transcripts,
+    _parse_transcription
+)
+
+
+def _inlined(key, text):
+    """Build one inlined batch response."""
+    return {
+        "metadata": {"key": key, "filename": f"{key}.mp3"},
+        "response": {"candidates": [{"content": {"parts": [{"text": text}]}}]}
+    }
+
+
+class TestParseTranscription:
+    """Test parsing of structured transcription responses."""
+    
+    def test_parses_json(self):
+        """Test transcript and speakers are read from the JSON response."""
+        output = _parse_transcription('{"transcript": " [Alice]: Hi. ", "speakers": ["Alice"]}')
+        assert output.transcript == "[Alice]: Hi."
+        assert output.speakers == ["Alice"]
+    
+    def test_missing_speakers_defaults_to_empty(self):
+        """Test a response without the optional speakers list still parses."""
+        output = _parse_transcription('{"transcript": "[Alice]: Hi."}')
+        assert output.transcript == "[Alice]: Hi."
+        assert output.speakers == []
+    
+    def test_recovers_truncated_transcript(self):
+        """Test JSON cut off mid-transcript keeps the decoded text, not the JSON."""
+        output = _parse_transcription('{"transcript": "[Alice]: Hi.\\n[Bob]: \\"Hey\\" and then \\u00')
+        assert output.transcript == '[Alice]: Hi.\n[Bob]: "Hey" and then'
+        assert output.speakers == []
+    
+    @pytest.mark.parametrize("text", [
+        '{"transcript": "Hi \\ud83d',
+        '{"transcript": "Hi \\ud83d\\ude0',
+        '{"transcript": "Hi \\ud83d\\u'
+    ])
+    def test_recovers_transcript_cut_in_surrogate_pair(self, text):
+        """Test a surrogate pair cut off mid-way leaves no unpaired surrogate."""
+        output = _parse_transcription(text)
+        assert output.transcript == "Hi"
+        output.transcript.encode("utf-8")
+    
+    def test_recovers_transcript_before_broken_speakers(self):
+        """Test JSON cut off in the speakers list keeps the whole transcript."""
+        output = _parse_transcription('{"transcript": "[Alice]: Hi.", "speakers": ["Ali')
+        assert output.transcript == "[Alice]: Hi."
+    
+    def test_no_transcript_raises(self):
+        """Test a response without any transcript value is an error."""
+        with pytest.raises(ValueError, match="did not contain a transcript"):
+            _parse_transcription('{"speakers": ["Alice"]')
+
+
+class TestBatchTranscripts:
+    """Test reading transcripts from batch operations."""
+    
+    def test_orders_by_request_key(self):
+        """Test transcripts follow request order, not response order."""
+        operation = {
+            "done": True,
+            "metadata": {"state": "BATCH_STATE_SUCCEEDED"},
+            "response": {"inlinedResponses": {"inlinedResponses": [
+                _inlined("req_1", " Second. "),
+                _inlined("req_0", "First.")
+            ]}}
+        }
+        assert _batch_transcripts(operation) == [("req_0.mp3", "First."), ("req_1.mp3", "Second.")]
+    
+    def test_failed_job_raises(self):
+        """Test a failed job is reported."""
+        operation = {"done": True, "metadata": {"state": "BATCH_STATE_FAILED"}}
+        with pytest.raises(Exception, match="Batch job failed"):
+            _batch_transcripts(operation)
+    
+    def test_failed_request_raises(self):
+        """Test a failed individual request is reported."""
+        operation = {
+            "done": True,
+            "metadata": {"state": "BATCH_STATE_SUCCEEDED"},
+            "response": {"inlinedResponses": {"inlinedResponses": [
+                {"metadata": {"key": "req_0"}, "error": {"message": "bad audio"}}
+            ]}}
+        }
+        with pytest.raises(Exception, match="req_0.*bad audio"):
+            _batch_transcripts(operation)
+    
+    def test_blocked_request_raises(self):
+        """Test a request blocked by safety filters is reported, not a KeyError."""
+        operation = {
+            "done": True,
+            "metadata": {"state": "BATCH_STATE_SUCCEEDED"},
+            "response": {"inlinedResponses": {"inlinedResponses": [
+                {
+                    "metadata": {"key": "req_0", "filename": "standup.mp3"},
+                    "response": {"promptFeedback": {"blockReason": "SAFETY"}}
+                }
+            ]}}
+        }
+        with pytest.raises(Exception, match="standup.mp3 failed: SAFETY") as excinfo:
+            _batch_transcripts(operation)
+        assert not isinstance(excinfo.value, LookupError)
+
+
+class TestGetBatch:
+    """Test checking batch jobs over the REST API."""
+    
+    def _service(self, handler):
+        """Build a service whose batch client is answered by handler."""
+        service = GeminiService.__new__(GeminiService)
+        service._batch_client = lambda: httpx.AsyncClient(
+            transport=httpx.MockTransport(handler), base_url="https://test"
+        )
+        return service
+    
+    async def test_running_job_has_no_results(self):
+        """Test an unfinished job reports its state only."""
+        service = self._service(lambda request: httpx.Response(
+            200, json={"name": "batches/abc", "metadata": {"state": "BATCH_STATE_RUNNING"}}
+        ))
+        assert await service.get_batch("abc") == ("BATCH_STATE_RUNNING", None)
+    
+    async def test_finished_job_returns_parsed_results(self):
+        """Test a finished job's responses are parsed and paired with filenames."""
+        service = self._service(lambda request: httpx.Response(200, json={
+            "name": "batches/abc",
+            "done": True,
+            "metadata": {"state": "BATCH_STATE_SUCCEEDED"},
+            "response": {"inlinedResponses": {"inlinedResponses": [
+                _inlined("req_0", '{"transcript": "[Alice]: Hi.", "speakers": ["Alice"]}')
+            ]}}
+        }))
+        
+        state, results = await service.get_batch("abc")
+        
+        assert state == "BATCH_STATE_SUCCEEDED"
+        assert [(name, output.transcript) for name, output in results] == [("req_0.mp3", "[Alice]: Hi.")]
+    
+    async def test_unknown_job_raises_not_found(self):
+        """Test a 404 from Gemini is reported as a missing job."""
+        service = self._service(lambda request: httpx.Response(404, json={}))
+        with pytest.raises(BatchJobNotFoundError):
+            await service.get_batch("missing")
+
+
+class TestUploadBatch:
+    """Test concurrent batch uploads."""
+    
+    async def test_failure_cleans_up_finished_uploads(self):
+        """Test a failed upload removes the others and raises the original error."""
+        service = GeminiService.__new__(GeminiService)
+        
+        async def upload(file_path):
+            if file_path == "bad.mp3":
+                raise TimeoutError("upload timed out")
+            return file_path
+        
+        service._upload_audio = upload
+        service._delete_uploaded = AsyncMock()
+        
+        with pytest.raises(TimeoutError):
+            await service.upload_batch(["a.mp3", "bad.mp3"])
+        
+        service._delete_uploaded.assert_awaited_once_with("a.mp3")
+    
+    async def test_cancellation_cleans_up_finished_uploads(self):
+        """Test a deadline hit mid-batch still removes the finished uploads."""
+        service = GeminiService.__new__(GeminiService)
+        
+        async def upload(file_path):
+            if file_path == "slow.mp3":
+                await asyncio.sleep(1)
+            return file_path
+        
+        service._upload_audio = upload
+        service._delete_uploaded = AsyncMock()
+        
+        with pytest.raises(TimeoutError):
+            async with asyncio.timeout(0.01):
+                await service.upload_batch(["a.mp3", "slow.mp3"])
+        
+        service._delete_uploaded.assert_awaited_once_with("a.mp3")
+
+
+class TestSubmitBatch:
+    """Test submitting batch jobs over the REST API."""
+    
+    async def test_cancellation_cleans_up_uploads(self):
+        """Test uploads are deleted when submission is cancelled."""
+        service = GeminiService.__new__(GeminiService)
+        service.model_name = "gemini-test"
+        service.transcription_config_json = {}
+        service._delete_uploaded = AsyncMock()
+        
+        async def handler(request):
+            await asyncio.sleep(1)
+        
+        service._batch_client = lambda: httpx.AsyncClient(
+            transport=httpx.MockTransport(handler), base_url="https://test"
+        )
+        audio_file = MagicMock(mime_type="audio/mp3", uri="https://test/files/a")
+        
+        with pytest.raises(TimeoutError):
+            async with asyncio.timeout(0.01):
+                await service.submit_batch([audio_file], ["a.mp3"])
+        
+        service._delete_uploaded.assert_awaited_once_with(audio_file)
+
+
+class TestUploadStream:
+    """Test uploading open files to the Files API."""
+    
+    def test_uploads_from_start_with_mime_type(self):
+        """Test a partly read stream is rewound before each attempt."""
+        service = GeminiService.__new__(GeminiService)
+        audio = io.BytesIO(b"fake audio")
+        audio.read(4)
+        
+        with patch("services.gemini_service._genai") as mock_sdk:
+            mock_genai = mock_sdk.return_value
+            mock_genai.upload_file.side_effect = lambda f, mime_type: f.read()
+            assert service._upload_stream(audio, "audio/mp3") == b"fake audio"
+        
+        mock_genai.upload_file.assert_called_once_with(audio, mime_type="audio/mp3")
+
+
+class TestCallWithRetry:
+    """Test retrying of transient Gemini errors."""
+    
+    @pytest.fixture
+    def service(self):
+        """Build a service without configuring the SDK."""
+        service = GeminiService.__new__(GeminiService)
+        service.retryable_errors = (TimeoutError, ConnectionError)
+        return service
+    
+    @patch("services.gemini_service.asyncio.sleep", new_callable=AsyncMock)
+    async def test_retries_then_succeeds(self, mock_sleep, service):
+        """Test a transient failure is retried with backoff."""
+        fn = MagicMock(side_effect=[ConnectionError("reset"), "ok"])
+        
+        assert await service._call_with_retry(fn, "arg") == "ok"
+        
+        assert fn.call_count == 2
+        mock_sleep.assert_awaited_once_with(2)
+    
+    @patch("services.gemini_service.asyncio.sleep", new_callable=AsyncMock)
+    async def test_gives_up_with_original_error(self, mock_sleep, service):
+        """Test the last error is re-raised once attempts run out."""
+        fn = MagicMock(side_effect=TimeoutError("slow"))
+        
+        with pytest.raises(TimeoutError):
+            await service._call_with_retry(fn)
+        
+        assert fn.call_count == 3
+    
+    async def test_other_errors_not_retried(self, service):
+        """Test non-transient errors propagate immediately."""
+        fn = MagicMock(side_effect=ValueError("bad request"))
+        
+        with pytest.raises(ValueError):
+            await service._call_with_retry(fn)
+        
+        assert fn.call_count == 1
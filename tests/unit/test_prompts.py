@@ -0,0 +1,35 @@
+"""
+Tests for prompt template rendering.
+"""
+import pytest
+
+from prompts.templates import (
+    PromptTemplate,
+    REFINEMENT_PROMPT,
+    REFINEMENT_TEMPLATE,
+    SUMMARIZATION_PROMPT,
+    SUMMARIZATION_TEMPLATE
+)
+
+
+class TestPromptTemplate:
+    """Test pre-split prompt templates."""
+    
+    def test_summarization_matches_format(self):
+        """Test rendering matches str.format output."""
+        values = {"date": "2024-01-15", "title": "Standup", "transcript": "[Alice]: Hi."}
+        assert SUMMARIZATION_TEMPLATE.render(**values) == SUMMARIZATION_PROMPT.format(**values)
+    
+    def test_refinement_matches_format(self):
+        """Test rendering matches str.format output."""
+        values = {
+            "speaker_mapping": "  - Speaker A → Alice",
+            "feedback": "None provided",
+            "transcript": "[Speaker A]: Hello {not a field}."
+        }
+        assert REFINEMENT_TEMPLATE.render(**values) == REFINEMENT_PROMPT.format(**values)
+    
+    def test_format_spec_rejected(self):
+        """Test that fields with format specs are rejected."""
+        with pytest.raises(ValueError):
+            PromptTemplate("Total: {amount:.2f}")
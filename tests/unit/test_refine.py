@@ -0,0 +1,105 @@
+"""
+Unit tests for refinement change detection and request validation.
+"""
+import pytest
+from pydantic import ValidationError
+
+from models import RefinementRequest
+from routers.refine import detect_changes
+
+
+class TestDetectChanges:
+    """Test change detection logic."""
+    
+    def test_detect_speaker_replacement(self):
+        """Test detection of speaker name replacements."""
+        original = "[Speaker A]: Hello [Speaker B]."
+        refined = "[Alice]: Hello [Bob]."
+        mapping = {"Speaker A": "Alice", "Speaker B": "Bob"}
+        
+        changes = detect_changes(original, refined, mapping)
+        assert any("Alice" in c for c in changes)
+        assert any("Bob" in c for c in changes)
+    
+    def test_detect_replacement_counts(self):
+        """Test that bracketed occurrences are counted once each."""
+        original = "[Speaker A]: Hi. [Speaker B]: Hey. [Speaker A]: Bye."
+        refined = "[Alice]: Hi. [Bob]: Hey. [Alice]: Bye."
+        mapping = {"Speaker A": "Alice", "Speaker B": "Bob"}
+        
+        changes = detect_changes(original, refined, mapping)
+        assert "Replaced 'Speaker A' with 'Alice' (2 occurrences)" in changes
+        assert "Replaced 'Speaker B' with 'Bob' (1 occurrences)" in changes
+    
+    def test_detect_large_transcript_counts(self, monkeypatch):
+        """Test that the Aho-Corasick path counts like the regex path."""
+        original = "[Speaker A]: Hi Speaker B. [Speaker B]: Hey. [Speaker A]: Bye."
+        refined = "[Alice]: Hi Bob. [Bob]: Hey. [Alice]: Bye."
+        mapping = {"Speaker A": "Alice", "Speaker B": "Bob"}
+        
+        expected = detect_changes(original, refined, mapping)
+        monkeypatch.setattr("routers.refine._AHOCORASICK_MIN_LENGTH", 0)
+        assert detect_changes(original, refined, mapping) == expected
+    
+    def test_detect_no_changes(self):
+        """Test when no changes are made."""
+        text = "Some transcript text."
+        changes = detect_changes(text, text, {"Speaker A": "Alice"})
+        assert any("No changes" in c for c in changes)
+    
+    def test_detect_general_changes(self):
+        """Test general change detection."""
+        original = "Old text"
+        refined = "New text"
+        changes = detect_changes(original, refined, {})
+        assert len(changes) >= 1
+
+
+class TestRequestValidation:
+    """Test request body validation without going through the endpoint."""
+    
+    @pytest.mark.parametrize("payload", [
+        pytest.param({"speaker_mapping": {"Speaker A": "Alice"}}, id="missing_transcript"),
+        pytest.param({"transcript": "[Speaker A]: Hello world."}, id="missing_mapping"),
+        pytest.param(
+            {"transcript": "[Speaker A]: Hello world.", "speaker_mapping": {}},
+            id="empty_mapping"
+        ),
+        pytest.param(
+            {"transcript": "Hi", "speaker_mapping": {"Speaker A": "Alice"}},
+            id="short_transcript"
+        )
+    ])
+    def test_incomplete_request_rejected(self, payload):
+        """Test missing, empty and too-short fields are rejected."""
+        with pytest.raises(ValidationError):
+            RefinementRequest.model_validate(payload)
+
+
+class TestSpeakerMappingValidation:
+    """Test speaker mapping validation."""
+    
+    def test_valid_mapping(self):
+        """Test that valid mappings are accepted."""
+        request = RefinementRequest(
+            transcript="[Speaker A]: Hello world testing.",
+            speaker_mapping={"Speaker A": "Alice", "Speaker B": "Bob"}
+        )
+        
+        assert len(request.speaker_mapping) == 2
+    
+    @pytest.mark.parametrize("extra", [
+        pytest.param({"speaker_mapping": {"": "Alice"}}, id="empty_key"),
+        pytest.param({"speaker_mapping": {"Speaker A": ""}}, id="empty_value"),
+        pytest.param({"speaker_mapping": {"Speaker A": "   "}}, id="blank_value"),
+        pytest.param(
+            {"speaker_mapping": {"Speaker A": "Alice"}, "speakers": {"Speaker A": "Alice"}},
+            id="unknown_field"
+        )
+    ])
+    def test_invalid_request_rejected(self, extra):
+        """Test that blank mapping entries and unexpected fields are rejected."""
+        data = {"transcript": "[Speaker A]: Hello world testing.", **extra}
+        
+        with pytest.raises(ValidationError):
+            RefinementRequest(**data)
@@ -0,0 +1,115 @@
+"""
+Unit tests for summary section extraction and request validation.
+"""
+import pytest
+from pydantic import ValidationError
+
+from models import TranscriptRequest
+from routers.summarize import extract_sections
+
+
+class TestExtractSections:
+    """Test section extraction from Markdown."""
+    
+    def test_extract_h2_sections(self):
+        """Test extraction of H2 headings."""
+        markdown = """
+# Meeting Notes
+
+## Executive Summary
+Content here.
+
+## Action Items
+More content.
+
+## Key Decisions
+Even more content.
+"""
+        sections = extract_sections(markdown)
+        assert "Executive Summary" in sections
+        assert "Action Items" in sections
+        assert "Key Decisions" in sections
+    
+    def test_extract_no_sections(self):
+        """Test when no H2 sections present."""
+        markdown = "# Just a title\nSome content."
+        sections = extract_sections(markdown)
+        assert len(sections) == 0
+    
+    def test_extract_mixed_headings(self):
+        """Test with mixed heading levels."""
+        markdown = """
+# H1 Title
+## H2 Section One
+### H3 Subsection
+## H2 Section Two
+"""
+        sections = extract_sections(markdown)
+        assert "H2 Section One" in sections
+        assert "H2 Section Two" in sections
+        assert len(sections) == 2
+    
+    def test_extract_strips_trailing_whitespace(self):
+        """Test that trailing whitespace is not part of the heading."""
+        markdown = "## Action Items   \n- Item\n##\nNot a heading"
+        sections = extract_sections(markdown)
+        assert sections == ["Action Items"]
+    
+    def test_extract_skips_blank_heading(self):
+        """Test that a heading marker followed only by spaces is skipped."""
+        markdown = "##   \n## Key Decisions\r\n- Decision"
+        assert extract_sections(markdown) == ["Key Decisions"]
+
+
+class TestRequestValidation:
+    """Test request body validation without going through the endpoint."""
+    
+    @pytest.mark.parametrize("payload", [
+        pytest.param({"date": "2024-01-15"}, id="missing_text"),
+        pytest.param({"text": "Some meeting transcript content here."}, id="missing_date"),
+        pytest.param({"text": "Too short", "date": "2024-01-15"}, id="short_transcript"),
+        pytest.param(
+            {
+                "text": "A sufficiently long transcript for testing the endpoint properly.",
+                "date": "not-a-date"
+            },
+            id="invalid_date_format"
+        )
+    ])
+    def test_incomplete_request_rejected(self, payload):
+        """Test missing, too-short and malformed fields are rejected."""
+        with pytest.raises(ValidationError):
+            TranscriptRequest.model_validate(payload)
+
+
+class TestDateValidation:
+    """Test date format validation."""
+    
+    @pytest.mark.parametrize("date", [
+        "2024-01-15",
+        "01/15/2024",
+        "01-15-2024"
+    ])
+    def test_valid_date_formats(self, date):
+        """Test that valid date formats are accepted."""
+        request = TranscriptRequest(
+            text="A sufficiently long transcript content for testing purposes here.",
+            date=date
+        )
+        assert request.date == date
+    
+    @pytest.mark.parametrize("date", [
+        "invalid-date-format",
+        "1/5/2024",
+        "01/15-2024",
+        "01-152024",
+        "2024/01/15",
+        "2024-01-15T10:00"
+    ])
+    def test_malformed_dates_rejected(self, date):
+        """Test that invalid dates and near-miss date shapes are rejected."""
+        with pytest.raises(ValidationError):
+            TranscriptRequest(
+                text="A sufficiently long transcript content for testing purposes here.",
+                date=date
+            )
@@ -0,0 +1,68 @@
+"""
+Unit tests for speaker extraction and file validation.
+"""
+import pytest
+
+from config import settings
+from routers.transcribe import extract_speakers
+
+
+class TestSpeakerExtraction:
+    """Test speaker extraction from transcripts."""
+    
+    def test_extract_basic_speakers(self):
+        """Test extraction of basic speaker format."""
+        transcript = """
+        [Speaker A] [00:00]: Hello everyone.
+        [Speaker B] [00:05]: Hi there!
+        [Speaker A] [00:10]: Let's get started.
+        """
+        speakers = extract_speakers(transcript)
+        assert "Speaker A" in speakers
+        assert "Speaker B" in speakers
+        assert len(speakers) == 2
+    
+    def test_extract_named_speakers(self):
+        """Test extraction of named speakers."""
+        transcript = """
+        [John] [00:00]: Hello everyone.
+        [Sarah] [00:05]: Hi there!
+        """
+        speakers = extract_speakers(transcript)
+        assert "John" in speakers
+        assert "Sarah" in speakers
+    
+    def test_extract_no_speakers(self):
+        """Test extraction when no speakers present."""
+        transcript = "Just some plain text without speakers."
+        speakers = extract_speakers(transcript)
+        assert len(speakers) == 0
+    
+    def test_extract_ignores_timestamps(self):
+        """Test that timestamps are not extracted as speakers."""
+        transcript = "[Speaker A] [00:00]: Hello."
+        speakers = extract_speakers(transcript)
+        assert "00:00" not in speakers
+        assert "Speaker A" in speakers
+    
+    def test_extract_nested_bracket(self):
+        """Test a stray opening bracket is not part of the label."""
+        assert extract_speakers("[[Speaker A]: Hello.") == ["Speaker A"]
+    
+    def test_extract_unclosed_brackets(self):
+        """Test many unclosed brackets are scanned in linear time."""
+        assert extract_speakers("[a" * 50000) == []
+
+
+class TestFileValidation:
+    """Test file validation logic."""
+    
+    @pytest.mark.parametrize("extension", [".mp3", ".wav", ".m4a", ".ogg", ".webm"])
+    def test_valid_extensions_accepted(self, extension):
+        """Test that valid extensions are handled."""
+        assert extension in settings.allowed_audio_extensions
+    
+    @pytest.mark.parametrize("extension", [".txt", ".pdf", ".doc", ".exe"])
+    def test_invalid_extensions_rejected(self, extension):
+        """Test that invalid extensions are rejected."""
+        assert extension not in settings.allowed_audio_extensions